@@ -5,6 +5,9 @@ import subprocess
 import threading
 import os
 import select
+import selectors
+import codecs
+import mmap
 import pty
 import tty
 import termios
@@ -12,8 +15,15 @@ import fcntl
 import struct
 import base64
 import socket
+from binascii import a2b_base64, b2a_base64
 import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # most guest images don't ship it; stdlib json works fine
+    orjson = None
 
 # This agent runs inside the guest on ttyS0.
 # It reads JSON commands from stdin and writes JSON events to stdout.
@@ -43,6 +53,20 @@ import time
 VSOCK_CID_HOST = 2  # Well-known CID for host
 
 
+def _json_dumps(obj) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_loads(data):
+    """Parse JSON from bytes or str (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 # Cached vsock availability. None = unknown, True = known-good (cached for
 # the lifetime of the VM — once it works it keeps working), False = recently
 # failed (reprobe after a short backoff).
@@ -58,13 +82,13 @@ _VSOCK_REPROBE_BASE = 2.0  # seconds for first reprobe after a failure
 _VSOCK_REPROBE_MAX = 30.0  # cap for repeated failures
 
 
+# Whether this interpreter was built with AF_VSOCK; fixed for the process.
+_HAS_AF_VSOCK = hasattr(socket, "AF_VSOCK")
+
+
 def _vsock_module_available() -> bool:
     """Return True if the Python socket module has AF_VSOCK."""
-    try:
-        socket.AF_VSOCK  # noqa: B018 - attribute access is the test
-        return True
-    except AttributeError:
-        return False
+    return _HAS_AF_VSOCK
 
 
 def _vsock_probe(port: int) -> bool:
@@ -135,6 +159,29 @@ def _vsock_mark_broken():
         _vsock_last_probe_ts = time.time()
 
 
+# Socket buffer size for file transfers. The defaults (256 KiB for vsock)
+# cap how much a single send can hand to the kernel.
+_VSOCK_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def _vsock_enlarge_buffers(sock):
+    """Best-effort bump of the socket buffers; kernels may clamp or refuse."""
+    options = [
+        (socket.SOL_SOCKET, socket.SO_SNDBUF),
+        (socket.SOL_SOCKET, socket.SO_RCVBUF),
+    ]
+    # The vsock transport sizes its stream buffer from its own options; the
+    # max has to be raised before the size or the size is clamped to it.
+    for name in ("SO_VM_SOCKETS_BUFFER_MAX_SIZE", "SO_VM_SOCKETS_BUFFER_SIZE"):
+        if hasattr(socket, name):
+            options.append((socket.AF_VSOCK, getattr(socket, name)))
+    for level, option in options:
+        try:
+            sock.setsockopt(level, option, _VSOCK_BUFFER_SIZE)
+        except OSError:
+            pass
+
+
 def vsock_create_connection(port: int, timeout: float = 10.0):
     """Create a new vsock connection to the host for a single transfer.
 
@@ -146,6 +193,7 @@ def vsock_create_connection(port: int, timeout: float = 10.0):
     global _vsock_available, _vsock_last_probe_ts, _vsock_fail_streak
     try:
         sock = socket.socket(socket.AF_VSOCK, socket.SOCK_STREAM)
+        _vsock_enlarge_buffers(sock)
         sock.settimeout(timeout)
         sock.connect((VSOCK_CID_HOST, port))
         # Successful connect doubles as our liveness signal — clear any
@@ -160,28 +208,73 @@ def vsock_create_connection(port: int, timeout: float = 10.0):
         return None
 
 
+def _sendmsg_all(sock, buffers):
+    """Like sendall() for several buffers, gathered into sendmsg() calls."""
+    views = [memoryview(b).cast("B") for b in buffers if len(b)]
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
+
+
 def vsock_send_json_msg(sock, data: dict):
     """Send a JSON message over a vsock connection (per-call, not shared)."""
-    message = json.dumps(data) + "\n"
-    sock.sendall(message.encode("utf-8"))
+    _sendmsg_all(sock, (_json_dumps(data), b"\n"))
 
 
 def vsock_recv_json_msg(sock) -> dict:
     """Receive a single newline-delimited JSON message from vsock."""
-    buffer = b""
-    while b"\n" not in buffer:
-        chunk = sock.recv(4096)
-        if not chunk:
+    # recv_into a reused scratch buffer and append to a growable bytearray:
+    # no bytes object per recv, no quadratic re-concatenation, and only the
+    # newly received bytes are scanned for the delimiter.
+    buffer = bytearray()
+    scratch = bytearray(4096)
+    scan_from = 0
+    while True:
+        n = sock.recv_into(scratch)
+        if not n:
             raise Exception("Vsock connection closed")
-        buffer += chunk
+        buffer += memoryview(scratch)[:n]
+        idx = buffer.find(b"\n", scan_from)
+        if idx != -1:
+            return _json_loads(buffer[:idx])
+        scan_from = len(buffer)
 
-    line, _ = buffer.split(b"\n", 1)
-    return json.loads(line.decode("utf-8"))
 
-
-# Global session registry
+# Global session registry. Exec threads, exit monitors and the dispatch loop
+# all touch it, so every access goes through _registry_lock.
 sessions = {}  # session_id -> process
 pty_masters = {}  # session_id -> master_fd
+_registry_lock = threading.Lock()
+
+
+def register_session(cmd_id, proc, master_fd=None):
+    with _registry_lock:
+        sessions[cmd_id] = proc
+        if master_fd is not None:
+            pty_masters[cmd_id] = master_fd
+
+
+def get_session(cmd_id):
+    """Return (process_or_pid, master_fd_or_None), or None if unknown."""
+    with _registry_lock:
+        if cmd_id not in sessions:
+            return None
+        return sessions[cmd_id], pty_masters.get(cmd_id)
+
+
+def pop_session(cmd_id):
+    """Drop a session and return its PTY master fd (None for pipe sessions).
+
+    Only the first caller gets the fd back, so it is closed exactly once.
+    """
+    with _registry_lock:
+        sessions.pop(cmd_id, None)
+        return pty_masters.pop(cmd_id, None)
 
 
 # Single lock serializes ALL writes to the serial console (stdout and stderr).
@@ -193,11 +286,54 @@ pty_masters = {}  # session_id -> master_fd
 _console_lock = threading.Lock()
 
 
-def send_event(event_type, payload):
-    msg = json.dumps({"type": event_type, "payload": payload})
+def _console_write(line: bytes):
+    """Write one serialized event line to the console under the lock."""
     with _console_lock:
-        sys.stdout.write(msg + "\n")
-        sys.stdout.flush()
+        # Write bytes straight to the binary layer when there is one, so the
+        # event isn't decoded and re-encoded by the TextIOWrapper. sys.stdout
+        # is looked up per call because tests swap it for a StringIO.
+        out = sys.stdout
+        raw = getattr(out, "buffer", None)
+        if raw is not None:
+            raw.write(line)
+            raw.flush()
+        else:
+            out.write(line.decode("utf-8"))
+            out.flush()
+
+
+# Every command ends with an exit event, so its envelope is pre-serialized
+# and only the cmd_id and exit code are filled in.
+_EXIT_EVENT = b'{"type":"exit","payload":{"cmd_id":%s,"exit_code":%d}}\n'
+
+
+def send_event(event_type, payload):
+    if event_type == "exit" and len(payload) == 2:
+        cmd_id = payload.get("cmd_id")
+        exit_code = payload.get("exit_code")
+        if type(cmd_id) is str and type(exit_code) is int:
+            _console_write(_EXIT_EVENT % (_json_dumps(cmd_id), exit_code))
+            return
+    _console_write(_json_dumps({"type": event_type, "payload": payload}) + b"\n")
+
+
+def _output_event_template(cmd_id, stream, encoding):
+    """Return (prefix, suffix) bytes of an ``output`` event around its data.
+
+    Only the base64 data changes between a session's output events, so the
+    rest of the envelope is serialized once and the data spliced in. The
+    base64 alphabet never needs JSON escaping.
+    """
+    prefix = (
+        b'{"type":"output","payload":{"cmd_id":'
+        + _json_dumps(cmd_id)
+        + b',"stream":'
+        + _json_dumps(stream)
+        + b',"encoding":'
+        + _json_dumps(encoding)
+        + b',"data":"'
+    )
+    return prefix, b'"}}\n'
 
 
 def log_stderr(msg: str):
@@ -213,37 +349,174 @@ def log_stderr(msg: str):
         sys.stderr.flush()
 
 
-def read_stream(stream, stream_name, cmd_id):
-    """Reads a stream line by line and sends events."""
-    try:
-        for line in stream:
-            send_event(
-                "output", {"cmd_id": cmd_id, "stream": stream_name, "data": line}
-            )
-    except ValueError:
-        # Stream closed
-        pass
+# Output from exec'd commands is read by a single reactor thread instead of
+# one reader thread per stream. Each readable pipe is drained with os.read
+# and decoded incrementally, so a multi-byte character split across reads
+# is still decoded correctly.
+_STREAM_READ_SIZE = 64 * 1024
+# How long a background command's exit event waits for its pipes to drain.
+# A backgrounded grandchild can hold them open indefinitely.
+_EXIT_DRAIN_TIMEOUT = 5.0
+
+
+class _OutputReactor:
+    """Services the stdout/stderr pipes of every exec'd command."""
+
+    def __init__(self):
+        self._sel = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        # Self-pipe so register() from another thread wakes up select()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def watch(self, fd, on_data):
+        """Call ``on_data(bytes)`` for each read from ``fd``; ``b""`` marks EOF.
+
+        Callbacks run on the reactor thread. The fd is unregistered before
+        the EOF callback, so the callback may close it.
+        """
+        os.set_blocking(fd, False)
+        with self._lock:
+            self._sel.register(fd, selectors.EVENT_READ, on_data)
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # a wakeup is already pending
+
+    def _run(self):
+        while True:
+            for key, _ in self._sel.select():
+                if key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                try:
+                    data = os.read(key.fd, _STREAM_READ_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if not data:
+                    with self._lock:
+                        self._sel.unregister(key.fd)
+                try:
+                    key.data(data)
+                except Exception:
+                    pass
+
+
+_output_reactor = None
+_output_reactor_lock = threading.Lock()
+
+
+def _get_output_reactor():
+    global _output_reactor
+    with _output_reactor_lock:
+        if _output_reactor is None:
+            _output_reactor = _OutputReactor()
+        return _output_reactor
+
+
+class _OutputStream:
+    """Reactor callback that emits one ``output`` event per read from a pipe.
+
+    Chunks are forwarded as soon as they arrive rather than held back until a
+    newline. The incremental decoder keeps multi-byte characters that straddle
+    two reads intact.
+    """
+
+    def __init__(self, cmd_id, stream_name, stream, on_eof):
+        self.cmd_id = cmd_id
+        self.stream_name = stream_name
+        self.stream = stream
+        self.on_eof = on_eof
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def _emit(self, text):
+        send_event(
+            "output", {"cmd_id": self.cmd_id, "stream": self.stream_name, "data": text}
+        )
+
+    def __call__(self, data):
+        text = self.decoder.decode(data, final=not data)
+        if text:
+            self._emit(text)
+        if not data:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            self.on_eof()
+
+
+def _watch_command_output(cmd_id, process):
+    """Hand a process's pipes to the reactor.
+
+    Returns an Event that is set once both stdout and stderr reached EOF.
+    """
+    drained = threading.Event()
+    remaining = [2]  # only touched from the reactor thread
+
+    def on_eof():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            drained.set()
+
+    reactor = _get_output_reactor()
+    for stream_name, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
+        reactor.watch(
+            stream.fileno(), _OutputStream(cmd_id, stream_name, stream, on_eof)
+        )
+    return drained
+
+
+# PTY output is coalesced into one event per burst: the first read blocks,
+# then whatever else is already buffered gets drained without waiting. The
+# caps keep a busy terminal from holding output back for too long.
+_PTY_READ_SIZE = 64 * 1024
+_PTY_COALESCE_MAX_BYTES = 128 * 1024
+_PTY_COALESCE_MAX_READS = 8
 
 
 def read_pty_master(master_fd, cmd_id):
     """Reads from PTY master and sends events."""
+    # PTY combines stdout/stderr usually
+    prefix, suffix = _output_event_template(cmd_id, "stdout", "base64")
     try:
         while True:
+            closed = False
             try:
-                data = os.read(master_fd, 1024)
+                data = os.read(master_fd, _PTY_READ_SIZE)
                 if not data:
                     break
 
-                encoded = base64.b64encode(data).decode("utf-8")
-                send_event(
-                    "output",
-                    {
-                        "cmd_id": cmd_id,
-                        "stream": "stdout",  # PTY combines stdout/stderr usually
-                        "data": encoded,
-                        "encoding": "base64",
-                    },
-                )
+                buf = bytearray(data)
+                reads = 1
+                while (
+                    len(buf) < _PTY_COALESCE_MAX_BYTES
+                    and reads < _PTY_COALESCE_MAX_READS
+                    and select.select([master_fd], [], [], 0)[0]
+                ):
+                    try:
+                        more = os.read(master_fd, _PTY_READ_SIZE)
+                    except OSError:
+                        # Report what we already have; the next blocking
+                        # read surfaces the error (EIO on close).
+                        break
+                    if not more:
+                        closed = True
+                        break
+                    buf += more
+                    reads += 1
+
+                _console_write(prefix + b2a_base64(buf, newline=False) + suffix)
+                if closed:
+                    break
             except OSError as e:
                 # EIO means PTY closed
                 if e.errno == 5:  # EIO
@@ -271,50 +544,31 @@ def handle_command(cmd_id, command, background=False, env=None):
             stdin=subprocess.PIPE,  # Enable stdin
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,  # Line buffered
+            # Binary pipes: output is read off the fds by the reactor and
+            # input is written straight to the stdin fd, so no text layer.
+            bufsize=0,
         )
 
         if background:
-            sessions[cmd_id] = process
-
-            # Start threads to read stdout/stderr
-            t_out = threading.Thread(
-                target=read_stream, args=(process.stdout, "stdout", cmd_id), daemon=True
-            )
-            t_err = threading.Thread(
-                target=read_stream, args=(process.stderr, "stderr", cmd_id), daemon=True
-            )
-            t_out.start()
-            t_err.start()
+            register_session(cmd_id, process)
+            send_event("status", {"cmd_id": cmd_id, "status": "started", "pid": process.pid})
+            drained = _watch_command_output(cmd_id, process)
 
             # Monitor exit in a separate thread
             def monitor_exit():
                 rc = process.wait()
-                if cmd_id in sessions:
-                    del sessions[cmd_id]
+                drained.wait(timeout=_EXIT_DRAIN_TIMEOUT)
+                pop_session(cmd_id)
                 send_event("exit", {"cmd_id": cmd_id, "exit_code": rc})
 
             t_mon = threading.Thread(target=monitor_exit, daemon=True)
             t_mon.start()
 
-            send_event("status", {"cmd_id": cmd_id, "status": "started", "pid": process.pid})
-
         else:
             # Blocking execution (legacy)
-            t_out = threading.Thread(
-                target=read_stream, args=(process.stdout, "stdout", cmd_id)
-            )
-            t_err = threading.Thread(
-                target=read_stream, args=(process.stderr, "stderr", cmd_id)
-            )
-            t_out.start()
-            t_err.start()
-
-            t_out.join()
-            t_err.join()
-
+            drained = _watch_command_output(cmd_id, process)
             rc = process.wait()
+            drained.wait()
             send_event("exit", {"cmd_id": cmd_id, "exit_code": rc})
 
     except Exception as e:
@@ -342,8 +596,7 @@ def handle_pty_command(cmd_id, command, cols=80, rows=24, env=None):
 
         else:
             # Parent process
-            pty_masters[cmd_id] = master_fd
-            sessions[cmd_id] = pid  # Store PID for PTY sessions
+            register_session(cmd_id, pid, master_fd)  # Store PID for PTY sessions
 
             # Start thread to read from master_fd
             t_read = threading.Thread(
@@ -356,11 +609,9 @@ def handle_pty_command(cmd_id, command, cols=80, rows=24, env=None):
                 _, status = os.waitpid(pid, 0)
                 exit_code = os.waitstatus_to_exitcode(status)
 
-                if cmd_id in sessions:
-                    del sessions[cmd_id]
-                if cmd_id in pty_masters:
-                    os.close(pty_masters[cmd_id])
-                    del pty_masters[cmd_id]
+                fd = pop_session(cmd_id)
+                if fd is not None:
+                    os.close(fd)
 
                 send_event("exit", {"cmd_id": cmd_id, "exit_code": exit_code})
 
@@ -373,37 +624,41 @@ def handle_pty_command(cmd_id, command, cols=80, rows=24, env=None):
         send_event("error", {"cmd_id": cmd_id, "error": str(e)})
 
 
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
 def handle_input(cmd_id, data, encoding=None):
-    if cmd_id in sessions:
-        if cmd_id in pty_masters:
-            # PTY session
-            master_fd = pty_masters[cmd_id]
-            try:
-                if encoding == "base64":
-                    content = base64.b64decode(data)
-                else:
-                    content = data.encode("utf-8")
-                os.write(master_fd, content)
-            except Exception as e:
-                send_event("error", {"cmd_id": cmd_id, "error": f"Write failed: {e}"})
-        else:
-            # Standard pipe session
-            proc = sessions[cmd_id]
-            if proc.stdin:
-                try:
-                    proc.stdin.write(data)
-                    proc.stdin.flush()
-                except Exception as e:
-                    send_event(
-                        "error", {"cmd_id": cmd_id, "error": f"Write failed: {e}"}
-                    )
-    else:
+    session = get_session(cmd_id)
+    if session is None:
         send_event("error", {"cmd_id": cmd_id, "error": "Session not found"})
+        return
+
+    proc, master_fd = session
+    if master_fd is None:
+        # Standard pipe session
+        if not proc.stdin:
+            return
+        fd = proc.stdin.fileno()
+    else:
+        # PTY session
+        fd = master_fd
+    try:
+        if encoding == "base64":
+            content = base64.b64decode(data)
+        else:
+            content = data.encode("utf-8")
+        _write_all(fd, content)
+    except Exception as e:
+        send_event("error", {"cmd_id": cmd_id, "error": f"Write failed: {e}"})
 
 
 def handle_resize(cmd_id, cols, rows):
-    if cmd_id in pty_masters:
-        master_fd = pty_masters[cmd_id]
+    with _registry_lock:
+        master_fd = pty_masters.get(cmd_id)
+    if master_fd is not None:
         try:
             winsize = struct.pack("HHHH", rows, cols, 0, 0)
             fcntl.ioctl(master_fd, termios.TIOCSWINSZ, winsize)
@@ -412,10 +667,12 @@ def handle_resize(cmd_id, cols, rows):
 
 
 def handle_kill(cmd_id):
-    if cmd_id in sessions:
-        if cmd_id in pty_masters:
+    session = get_session(cmd_id)
+    if session is not None:
+        proc, master_fd = session
+        if master_fd is not None:
             # PTY session - kill process group?
-            pid = sessions[cmd_id]
+            pid = proc
             import signal
 
             try:
@@ -423,7 +680,6 @@ def handle_kill(cmd_id):
             except Exception as e:
                 send_event("error", {"cmd_id": cmd_id, "error": f"Kill failed: {e}"})
         else:
-            proc = sessions[cmd_id]
             try:
                 proc.terminate()
             except Exception as e:
@@ -439,13 +695,13 @@ def handle_read_file(cmd_id, path):
     Sends file_chunk events for each chunk, then file_complete at end.
     """
     try:
-        if not os.path.exists(path):
+        try:
+            file_size = os.stat(path).st_size
+        except FileNotFoundError:
             send_event("error", {"cmd_id": cmd_id, "error": f"File not found: {path}"})
             send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
             return
 
-        file_size = os.path.getsize(path)
-
         # 16KB chunks. Older code used 2KB + 200ms sleep, sized for a
         # supposed 115200-baud serial limit. The Firecracker virtio-serial
         # transport is much faster than that — kernel-level write() blocks
@@ -457,34 +713,54 @@ def handle_read_file(cmd_id, path):
             # Small file - send all at once (backward compatible)
             with open(path, "rb") as f:
                 content = f.read()
-            encoded = base64.b64encode(content).decode("utf-8")
-            send_event("file_content", {"cmd_id": cmd_id, "path": path, "content": encoded})
+            data = b2a_base64(content, newline=False)
+            _console_write(
+                b'{"type":"file_content","payload":{"cmd_id":%s,"path":%s,"content":"%s"}}\n'
+                % (_json_dumps(cmd_id), _json_dumps(path), data)
+            )
             send_event("exit", {"cmd_id": cmd_id, "exit_code": 0})
         else:
             # Large file - send in chunks with throttling for serial console
             md5 = hashlib.md5()
             offset = 0
+            # Everything but offset/size/data is fixed for the transfer, and
+            # the base64 bytes are spliced in without a str round-trip.
+            chunk_head = b'{"type":"file_chunk","payload":{"cmd_id":%s,"path":%s' % (
+                _json_dumps(cmd_id),
+                _json_dumps(path),
+            )
 
             with open(path, "rb") as f:
-                while True:
-                    chunk = f.read(CHUNK_SIZE)
-                    if not chunk:
-                        break
-
-                    md5.update(chunk)
-                    encoded = base64.b64encode(chunk).decode("utf-8")
+                # Map the file once and slice chunks out of the mapping
+                # instead of issuing a read() per chunk. Files that can't be
+                # mapped (pipes, some pseudo-files) fall back to read().
+                try:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    mm = None
 
-                    send_event("file_chunk", {
-                        "cmd_id": cmd_id,
-                        "path": path,
-                        "data": encoded,
-                        "offset": offset,
-                        "size": len(chunk)
-                    })
+                try:
+                    while True:
+                        if mm is not None:
+                            chunk = mm[offset : offset + CHUNK_SIZE]
+                        else:
+                            chunk = f.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+
+                        md5.update(chunk)
+                        data = b2a_base64(chunk, newline=False)
+                        _console_write(
+                            b'%s,"offset":%d,"size":%d,"data":"%s"}}\n'
+                            % (chunk_head, offset, len(chunk), data)
+                        )
 
-                    offset += len(chunk)
-                    # No artificial throttle — write() above blocks if the
-                    # serial buffer is full, which is the correct backpressure.
+                        offset += len(chunk)
+                        # No artificial throttle — write() above blocks if the
+                        # serial buffer is full, which is the correct backpressure.
+                finally:
+                    if mm is not None:
+                        mm.close()
 
             # Send completion event with checksum
             send_event("file_complete", {
@@ -507,12 +783,16 @@ def handle_write_file(cmd_id, path, content, mode="wb", append=False):
         if dirname:
             os.makedirs(dirname, exist_ok=True)
 
-        decoded = base64.b64decode(content)
-
-        file_mode = "ab" if append else "wb"
+        # a2b_base64 is the C decoder base64.b64decode wraps; it takes the
+        # ASCII str straight from the request.
+        decoded = a2b_base64(content)
 
-        with open(path, file_mode) as f:
-            f.write(decoded)
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+        fd = os.open(path, flags, 0o666)
+        try:
+            _write_all(fd, decoded)
+        finally:
+            os.close(fd)
 
         send_event("status", {"cmd_id": cmd_id, "status": "written"})
         send_event("exit", {"cmd_id": cmd_id, "exit_code": 0})
@@ -540,13 +820,19 @@ def handle_write_text(cmd_id, path, content, append=False):
         send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
 
 
+# Read size for vsock uploads; each block is hashed and sent before the next
+# one is read, so the file is only traversed once.
+_UPLOAD_SEND_SIZE = 1024 * 1024
+
+
 def handle_vsock_upload_to_host(cmd_id, path: str, vsock_port: int = None):
     """Uploads a file from guest to host via vsock (guest-initiated).
 
     Triggered by a read_file request from the host. The guest opens a new
     vsock connection, sends the upload request, streams file contents, then
     closes the connection. Each transfer uses its own short-lived socket so
-    concurrent transfers don't fight over shared state.
+    concurrent transfers don't fight over shared state. The MD5 is computed
+    while streaming and sent as a trailing message after the raw bytes.
 
     Falls back to serial (handle_read_file) on any vsock failure.
     """
@@ -555,23 +841,13 @@ def handle_vsock_upload_to_host(cmd_id, path: str, vsock_port: int = None):
     sock = None
 
     try:
-        if not os.path.exists(path):
+        try:
+            file_size = os.stat(path).st_size
+        except FileNotFoundError:
             send_event("error", {"cmd_id": cmd_id, "error": f"File not found: {path}"})
             send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
             return
 
-        file_size = os.path.getsize(path)
-
-        # Compute checksum up front so the host can verify the stream
-        md5 = hashlib.md5()
-        with open(path, "rb") as f:
-            while True:
-                chunk = f.read(65536)
-                if not chunk:
-                    break
-                md5.update(chunk)
-        checksum = md5.hexdigest()
-
         sock = vsock_create_connection(vsock_port)
         if sock is None:
             # Vsock unavailable — silently fall back to serial. We do NOT write
@@ -587,7 +863,7 @@ def handle_vsock_upload_to_host(cmd_id, path: str, vsock_port: int = None):
                 "type": "upload",
                 "path": path,
                 "size": file_size,
-                "checksum": checksum,
+                "trailing_checksum": True,
                 "cmd_id": cmd_id,
             },
         )
@@ -599,13 +875,22 @@ def handle_vsock_upload_to_host(cmd_id, path: str, vsock_port: int = None):
         if response.get("type") != "ready":
             raise Exception(f"unexpected response type: {response.get('type')}")
 
-        # Stream the file
-        with open(path, "rb") as f:
-            while True:
-                chunk = f.read(65536)
-                if not chunk:
+        # Stream the file, hashing each block on the way out, then send the
+        # checksum so the host can verify before it replies "complete".
+        md5 = hashlib.md5()
+        buf = bytearray(min(_UPLOAD_SEND_SIZE, file_size) or 1)
+        view = memoryview(buf)
+        remaining = file_size
+        with open(path, "rb", buffering=0) as f:
+            while remaining:
+                n = f.readinto(view[: min(len(buf), remaining)])
+                if not n:
                     break
+                chunk = view[:n]
+                md5.update(chunk)
                 sock.sendall(chunk)
+                remaining -= n
+        vsock_send_json_msg(sock, {"type": "checksum", "md5": md5.hexdigest()})
 
         # Wait for completion
         response = vsock_recv_json_msg(sock)
@@ -649,12 +934,13 @@ def handle_vsock_upload_to_host(cmd_id, path: str, vsock_port: int = None):
 
 def handle_file_info(cmd_id, path):
     try:
-        if not os.path.exists(path):
+        try:
+            stat_info = os.stat(path)
+        except FileNotFoundError:
             send_event("error", {"cmd_id": cmd_id, "error": f"Path not found: {path}"})
             send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
             return
 
-        stat_info = os.stat(path)
         send_event(
             "status",
             {
@@ -672,11 +958,6 @@ def handle_file_info(cmd_id, path):
 
 def handle_list_dir(cmd_id, path):
     try:
-        if not os.path.exists(path):
-            send_event("error", {"cmd_id": cmd_id, "error": f"Path not found: {path}"})
-            send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
-            return
-
         files = []
         try:
             with os.scandir(path) as it:
@@ -695,6 +976,10 @@ def handle_list_dir(cmd_id, path):
                     except OSError:
                         # Handle cases where stat fails (broken links etc)
                         files.append({"name": entry.name, "type": "unknown", "size": 0})
+        except FileNotFoundError:
+            send_event("error", {"cmd_id": cmd_id, "error": f"Path not found: {path}"})
+            send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
+            return
         except NotADirectoryError:
             send_event("error", {"cmd_id": cmd_id, "error": f"Not a directory: {path}"})
             send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
@@ -708,131 +993,188 @@ def handle_list_dir(cmd_id, path):
         send_event("exit", {"cmd_id": cmd_id, "exit_code": 1})
 
 
+def _req_exec(req):
+    cmd = req.get("command")
+    if not cmd:
+        send_event("error", {"error": "Invalid request"})
+        return
+    handle_command(req.get("id"), cmd, req.get("background", False), req.get("env"))
+
+
+def _req_pty_exec(req):
+    handle_pty_command(
+        req.get("id"),
+        req.get("command"),
+        req.get("cols", 80),
+        req.get("rows", 24),
+        req.get("env"),
+    )
+
+
+def _req_input(req):
+    handle_input(req.get("id"), req.get("data"), req.get("encoding"))
+
+
+def _req_resize(req):
+    handle_resize(req.get("id"), req.get("cols", 80), req.get("rows", 24))
+
+
+def _req_kill(req):
+    handle_kill(req.get("id"))
+
+
+def _req_read_file(req):
+    cmd_id = req.get("id")
+    path = req.get("path")
+    vsock_port = int(req.get("vsock_port") or os.environ.get("BANDSOX_VSOCK_PORT", "9000"))
+    use_vsock = bool(req.get("use_vsock", False))
+
+    # Only use the guest->host vsock upload fast path for
+    # download_file(), where the host pre-registers a destination
+    # for this cmd_id. Plain read_file callers need serial
+    # file_content/file_chunk events back on the request stream.
+    if use_vsock and _vsock_can_use(vsock_port):
+        handle_vsock_upload_to_host(cmd_id, path, vsock_port)
+    else:
+        handle_read_file(cmd_id, path)
+
+
+def _req_file_info(req):
+    # file_info currently doesn't use vsock, always use serial
+    handle_file_info(req.get("id"), req.get("path"))
+
+
+def _req_write_file(req):
+    # Content is already in the request (sent via serial/multiplexer).
+    # vsock upload is only for explicit vsock_upload requests where data
+    # streams via vsock.
+    handle_write_file(
+        req.get("id"), req.get("path"), req.get("content"), "wb", req.get("append", False)
+    )
+
+
+def _req_write_text(req):
+    handle_write_text(
+        req.get("id"), req.get("path"), req.get("content", ""), req.get("append", False)
+    )
+
+
+def _req_list_dir(req):
+    handle_list_dir(req.get("id"), req.get("path"))
+
+
+# How a request runs relative to the stdin loop.
+_INLINE = "inline"  # cheap and order-sensitive: run on the stdin loop
+_THREAD = "thread"  # may run for as long as the command does: own thread
+_POOL = "pool"  # short blocking I/O: bounded worker pool
+
+# write_file payloads up to this size (base64 chars) are written inline: the
+# write is cheaper than handing the request to a worker.
+_INLINE_WRITE_MAX = 64 * 1024
+
+
+def _write_file_mode(req):
+    content = req.get("content")
+    if isinstance(content, str) and len(content) <= _INLINE_WRITE_MAX:
+        return _INLINE
+    return _POOL
+
+
+# req_type -> (handler, mode), where mode may also be a function of the
+# request that returns one. Session control messages (input/resize/kill)
+# run inline. exec can block for the lifetime of a foreground command, so it
+# keeps a dedicated thread rather than tying up a pool worker. File
+# operations share a bounded pool so a burst of requests can't spawn an
+# unbounded number of threads.
+REQUEST_HANDLERS = {
+    "exec": (_req_exec, _THREAD),
+    "pty_exec": (_req_pty_exec, _POOL),
+    "input": (_req_input, _INLINE),
+    "resize": (_req_resize, _INLINE),
+    "kill": (_req_kill, _INLINE),
+    "read_file": (_req_read_file, _POOL),
+    "file_info": (_req_file_info, _POOL),
+    "write_file": (_req_write_file, _write_file_mode),
+    "write_text": (_req_write_text, _POOL),
+    "list_dir": (_req_list_dir, _POOL),
+}
+
+_WORKER_POOL_SIZE = min(32, (os.cpu_count() or 1) * 4)
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def _get_worker_pool():
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                _worker_pool = ThreadPoolExecutor(
+                    max_workers=_WORKER_POOL_SIZE, thread_name_prefix="agent-worker"
+                )
+    return _worker_pool
+
+
+def dispatch_request(req):
+    req_type = req.get("type", "exec")  # Default to exec for backward compat
+    entry = REQUEST_HANDLERS.get(req_type)
+    if entry is None:
+        send_event(
+            "error",
+            {"cmd_id": req.get("id"), "error": f"Unknown request type: {req_type}"},
+        )
+        return
+    handler, mode = entry
+    if callable(mode):
+        mode = mode(req)
+    if mode == _POOL:
+        _get_worker_pool().submit(handler, req)
+    elif mode == _THREAD:
+        threading.Thread(target=handler, args=(req,), daemon=True).start()
+    else:
+        handler(req)
+
+
 def main():
     # Ensure stdout is line buffered or unbuffered
     # sys.stdout.reconfigure(line_buffering=True) # Python 3.7+
 
     send_event("status", {"status": "ready"})
 
+    # Read raw bytes from the stdin fd and split lines ourselves instead of
+    # going through the TextIOWrapper; JSON is parsed straight from bytes and
+    # several pipelined requests are handled per read.
+    stdin_fd = sys.stdin.fileno()
+    pending = bytearray()
+
     while True:
         try:
-            line = sys.stdin.readline()
-            if not line:
+            data = os.read(stdin_fd, 65536)
+            if not data:
                 break
+            pending += data
 
-            try:
-                req = json.loads(line)
-                req_type = req.get(
-                    "type", "exec"
-                )  # Default to exec for backward compat
-                cmd_id = req.get("id")
-
-                if req_type == "exec":
-                    cmd = req.get("command")
-                    bg = req.get("background", False)
-                    env = req.get("env")
-                    if cmd:
-                        # Run in a thread to allow concurrent commands/sessions
-                        t = threading.Thread(
-                            target=handle_command,
-                            args=(cmd_id, cmd, bg, env),
-                            daemon=True,
-                        )
-                        t.start()
-                    else:
-                        send_event("error", {"error": "Invalid request"})
-
-                elif req_type == "pty_exec":
-                    cmd = req.get("command")
-                    cols = req.get("cols", 80)
-                    rows = req.get("rows", 24)
-                    env = req.get("env")
-                    t = threading.Thread(
-                        target=handle_pty_command,
-                        args=(cmd_id, cmd, cols, rows, env),
-                        daemon=True,
-                    )
-                    t.start()
-
-                elif req_type == "input":
-                    data = req.get("data")
-                    encoding = req.get("encoding")
-                    handle_input(cmd_id, data, encoding)
-
-                elif req_type == "resize":
-                    cols = req.get("cols", 80)
-                    rows = req.get("rows", 24)
-                    handle_resize(cmd_id, cols, rows)
-
-                elif req_type == "kill":
-                    handle_kill(cmd_id)
-
-                elif req_type == "read_file":
-                    path = req.get("path")
-                    vsock_port = int(req.get("vsock_port") or os.environ.get("BANDSOX_VSOCK_PORT", "9000"))
-                    use_vsock = bool(req.get("use_vsock", False))
-
-                    # Only use the guest->host vsock upload fast path for
-                    # download_file(), where the host pre-registers a destination
-                    # for this cmd_id. Plain read_file callers need serial
-                    # file_content/file_chunk events back on the request stream.
-                    if use_vsock and _vsock_can_use(vsock_port):
-                        t = threading.Thread(
-                            target=handle_vsock_upload_to_host,
-                            args=(cmd_id, path, vsock_port),
-                            daemon=True,
-                        )
-                        t.start()
-                    else:
-                        t = threading.Thread(
-                            target=handle_read_file, args=(cmd_id, path), daemon=True
-                        )
-                        t.start()
-
-                elif req_type == "file_info":
-                    path = req.get("path")
-                    # file_info currently doesn't use vsock, always use serial
-                    t = threading.Thread(
-                        target=handle_file_info, args=(cmd_id, path), daemon=True
-                    )
-                    t.start()
-
-                elif req_type == "write_file":
-                    path = req.get("path")
-                    content = req.get("content")
-                    append = req.get("append", False)
-
-                    # Content is already in the request (sent via serial/multiplexer)
-                    # Use handle_write_file directly - vsock upload is only for
-                    # explicit vsock_upload requests where data streams via vsock
-                    t = threading.Thread(
-                        target=handle_write_file,
-                        args=(cmd_id, path, content, "wb", append),
-                        daemon=True,
-                    )
-                    t.start()
-
-                elif req_type == "write_text":
-                    path = req.get("path")
-                    content = req.get("content", "")
-                    append = req.get("append", False)
-                    t = threading.Thread(
-                        target=handle_write_text,
-                        args=(cmd_id, path, content, append),
-                        daemon=True,
-                    )
-                    t.start()
-
-                elif req_type == "list_dir":
-                    path = req.get("path")
-                    t = threading.Thread(
-                        target=handle_list_dir, args=(cmd_id, path), daemon=True
-                    )
-                    t.start()
-
-            except json.JSONDecodeError:
-                # Ignore noise
-                pass
+            start = 0
+            while True:
+                end = pending.find(b"\n", start)
+                if end == -1:
+                    break
+                line = pending[start:end].strip()
+                start = end + 1
+
+                # Requests are JSON objects; anything else on the console
+                # (kernel messages, echoes) is skipped without a parse.
+                if not line.startswith(b"{"):
+                    continue
+                try:
+                    req = _json_loads(line)
+                except ValueError:
+                    # Ignore noise: malformed JSON, or bytes that aren't
+                    # valid UTF-8 (UnicodeDecodeError) from a garbled line.
+                    continue
+                if isinstance(req, dict):
+                    dispatch_request(req)
+            del pending[:start]
 
         except KeyboardInterrupt:
             break
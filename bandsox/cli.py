@@ -1,23 +1,36 @@
 import argparse
-import uvicorn
 import os
 import sys
 import threading
 import json
-import base64
 import signal
+import select
 import shutil
-import termios
-import tty
-import fcntl
-import struct
-import requests
 import tarfile
 import tempfile
+import time
 from pathlib import Path
 from urllib.parse import urlparse
 
 
+_HTTP_SESSION = None
+
+
+def _http():
+    """Shared requests session so repeated calls reuse pooled connections."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        # Imported here so commands that never touch HTTP skip the import.
+        import requests
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _HTTP_SESSION = session
+    return _HTTP_SESSION
+
+
 def _load_credentials():
     cred_path = _real_home() / ".bandsox" / "credentials"
     if not cred_path.exists():
@@ -123,6 +136,8 @@ def terminal_client(vm_id, host, port):
     except ImportError:
         print("Error: 'websockets' library is required. Please install it.")
         return
+    import termios
+    import tty
 
     cols, rows = shutil.get_terminal_size()
     creds = _load_credentials()
@@ -138,16 +153,16 @@ def terminal_client(vm_id, host, port):
             old_settings = termios.tcgetattr(fd)
             
             stop_event = threading.Event()
-            
+
+            # The handler only pokes a self-pipe; the input loop sends the
+            # resize frame so it can never interleave with a stdin send.
+            resize_r, resize_w = os.pipe()
+            os.set_blocking(resize_w, False)
+
             def on_resize(signum, frame):
-                c, r = shutil.get_terminal_size()
                 try:
-                    websocket.send(json.dumps({
-                        "type": "resize",
-                        "cols": c,
-                        "rows": r
-                    }))
-                except Exception:
+                    os.write(resize_w, b"R")
+                except BlockingIOError:
                     pass
 
             signal.signal(signal.SIGWINCH, on_resize)
@@ -156,10 +171,23 @@ def terminal_client(vm_id, host, port):
                 try:
                     while not stop_event.is_set():
                         try:
+                            out = bytearray()
                             message = websocket.recv()
-                            # message is base64 encoded
-                            decoded = base64.b64decode(message)
-                            sys.stdout.buffer.write(decoded)
+                            while True:
+                                # The server forwards terminal output as text
+                                # frames; binary frames are written as-is.
+                                if isinstance(message, str):
+                                    message = message.encode("utf-8")
+                                out += message
+                                if len(out) >= 1 << 20:
+                                    break
+                                # Drain frames that already arrived so a burst
+                                # of output costs one write and one flush.
+                                try:
+                                    message = websocket.recv(timeout=0)
+                                except TimeoutError:
+                                    break
+                            sys.stdout.buffer.write(out)
                             sys.stdout.buffer.flush()
                         except Exception:
                             break
@@ -175,15 +203,29 @@ def terminal_client(vm_id, host, port):
             try:
                 tty.setraw(fd)
                 while not stop_event.is_set():
-                    data = sys.stdin.buffer.read(1)
+                    ready, _, _ = select.select([fd, resize_r], [], [])
+                    if resize_r in ready:
+                        # Several SIGWINCHes during one paste collapse into
+                        # a single resize for the latest size.
+                        os.read(resize_r, 4096)
+                        c, r = shutil.get_terminal_size()
+                        websocket.send(json.dumps({
+                            "type": "resize",
+                            "cols": c,
+                            "rows": r
+                        }))
+                    if fd not in ready:
+                        continue
+                    # Raw mode returns as soon as one byte is available but
+                    # hands back everything already buffered, so a paste
+                    # goes out as one frame instead of one frame per byte.
+                    data = os.read(fd, 65536)
                     if not data:
                         break
                     
-                    encoded = base64.b64encode(data).decode('utf-8')
-                    websocket.send(json.dumps({
-                        "type": "input",
-                        "data": encoded
-                    }))
+                    # Raw bytes go out as a binary frame; JSON is only used
+                    # for control messages such as resize.
+                    websocket.send(data)
             except Exception:
                 pass
             finally:
@@ -237,11 +279,12 @@ def _stream_download(url, output_path, label, force=False):
 
     print(f"Downloading {label} from {url} -> {output_path}")
     try:
-        response = requests.get(url, stream=True)
+        response = _http().get(url, stream=True)
         response.raise_for_status()
         total_size = int(response.headers.get("content-length", 0))
-        block_size = 8192
+        block_size = 1024 * 1024
         downloaded = 0
+        last_report = 0.0
 
         with open(output_path, "wb") as f:
             for chunk in response.iter_content(chunk_size=block_size):
@@ -249,11 +292,14 @@ def _stream_download(url, output_path, label, force=False):
                     continue
                 downloaded += len(chunk)
                 f.write(chunk)
-                if total_size > 0:
+                # Redraw the progress line at most ~10 times a second.
+                now = time.monotonic()
+                if total_size > 0 and now - last_report >= 0.1:
+                    last_report = now
                     percent = int(downloaded / total_size * 100)
                     print(f"Downloading {label}: {percent}%", end="\r")
         if total_size > 0:
-            print()
+            print(f"Downloading {label}: {int(downloaded / total_size * 100)}%")
         print(f"{label} downloaded to {output_path}")
         return True
     except Exception as e:
@@ -467,6 +513,8 @@ def main():
         os.environ["BANDSOX_STORAGE"] = storage_path
 
         print(f"Starting dashboard at http://{args.host}:{args.port}")
+        import uvicorn
+
         uvicorn.run("bandsox.server:app", host=args.host, port=args.port, reload=True)
     elif args.command == "terminal":
         terminal_client(args.vm_id, args.host, args.port)
@@ -480,7 +528,7 @@ def main():
             payload["mem_mib"] = args.mem
             payload["disk_size_mib"] = args.disk_size
             
-            resp = requests.post(url, json=payload, headers=_auth_headers())
+            resp = _http().post(url, json=payload, headers=_auth_headers())
             if resp.status_code == 200:
                 print(f"VM created: {resp.json()['id']}")
             else:
@@ -494,7 +542,7 @@ def main():
         base = f"http://{args.host}:{args.port}/api/vms"
         if args.vm_command == "list":
             try:
-                resp = requests.get(base, headers=_auth_headers())
+                resp = _http().get(base, headers=_auth_headers())
                 if resp.status_code != 200:
                     print(f"Failed to list VMs ({resp.status_code}): {resp.text}")
                     return
@@ -523,7 +571,7 @@ def main():
         elif args.vm_command == "stop":
             url = f"{base}/{args.vm_id}/stop"
             try:
-                resp = requests.post(url, headers=_auth_headers())
+                resp = _http().post(url, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"VM {args.vm_id} stopped.")
                 else:
@@ -533,7 +581,7 @@ def main():
         elif args.vm_command == "pause":
             url = f"{base}/{args.vm_id}/pause"
             try:
-                resp = requests.post(url, headers=_auth_headers())
+                resp = _http().post(url, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"VM {args.vm_id} paused.")
                 else:
@@ -543,7 +591,7 @@ def main():
         elif args.vm_command == "resume":
             url = f"{base}/{args.vm_id}/resume"
             try:
-                resp = requests.post(url, headers=_auth_headers())
+                resp = _http().post(url, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"VM {args.vm_id} resumed.")
                 else:
@@ -553,7 +601,7 @@ def main():
         elif args.vm_command == "delete":
             url = f"{base}/{args.vm_id}"
             try:
-                resp = requests.delete(url, headers=_auth_headers())
+                resp = _http().delete(url, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"VM {args.vm_id} deleted.")
                 else:
@@ -563,7 +611,7 @@ def main():
         elif args.vm_command == "save":
             url = f"{base}/{args.vm_id}/snapshot"
             try:
-                resp = requests.post(url, json={"name": args.name}, headers=_auth_headers())
+                resp = _http().post(url, json={"name": args.name}, headers=_auth_headers())
                 if resp.status_code == 200:
                     data = resp.json()
                     snap_id = data.get("snapshot_id", "<unknown>")
@@ -575,7 +623,7 @@ def main():
         elif args.vm_command == "rename":
             url = f"{base}/{args.vm_id}/name"
             try:
-                resp = requests.put(url, json={"name": args.name}, headers=_auth_headers())
+                resp = _http().put(url, json={"name": args.name}, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"VM {args.vm_id} renamed to '{args.name}'")
                 else:
@@ -591,7 +639,7 @@ def main():
         base = f"http://{args.host}:{args.port}/api/snapshots"
         if args.snapshot_command == "list":
             try:
-                resp = requests.get(base, headers=_auth_headers())
+                resp = _http().get(base, headers=_auth_headers())
                 if resp.status_code != 200:
                     print(f"Failed to list snapshots ({resp.status_code}): {resp.text}")
                     return
@@ -619,7 +667,7 @@ def main():
         elif args.snapshot_command == "delete":
             url = f"{base}/{args.snapshot_id}"
             try:
-                resp = requests.delete(url, headers=_auth_headers())
+                resp = _http().delete(url, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"Snapshot {args.snapshot_id} deleted.")
                 else:
@@ -630,7 +678,7 @@ def main():
             url = f"{base}/{args.snapshot_id}/restore"
             payload = {"name": args.name, "enable_networking": args.enable_networking}
             try:
-                resp = requests.post(url, json=payload, headers=_auth_headers())
+                resp = _http().post(url, json=payload, headers=_auth_headers())
                 if resp.status_code == 200:
                     data = resp.json()
                     new_id = data.get("id", "<unknown>")
@@ -642,7 +690,7 @@ def main():
         elif args.snapshot_command == "rename":
             url = f"{base}/{args.snapshot_id}/name"
             try:
-                resp = requests.put(url, json={"name": args.name}, headers=_auth_headers())
+                resp = _http().put(url, json={"name": args.name}, headers=_auth_headers())
                 if resp.status_code == 200:
                     print(f"Snapshot {args.snapshot_id} renamed to '{args.name}'")
                 else:
@@ -703,7 +751,7 @@ def main():
 
         elif args.auth_command == "create-key":
             base = f"http://{args.host}:{args.port}"
-            resp = requests.post(
+            resp = _http().post(
                 f"{base}/api/auth/keys",
                 json={"name": args.name},
                 headers=_auth_headers(),
@@ -725,7 +773,7 @@ def main():
 
         elif args.auth_command == "list-keys":
             base = f"http://{args.host}:{args.port}"
-            resp = requests.get(f"{base}/api/auth/keys", headers=_auth_headers())
+            resp = _http().get(f"{base}/api/auth/keys", headers=_auth_headers())
             if resp.status_code == 200:
                 keys = resp.json()
                 if not keys:
@@ -742,7 +790,7 @@ def main():
 
         elif args.auth_command == "revoke-key":
             base = f"http://{args.host}:{args.port}"
-            resp = requests.delete(
+            resp = _http().delete(
                 f"{base}/api/auth/keys/{args.key_id}",
                 headers=_auth_headers(),
             )
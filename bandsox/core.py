@@ -1,11 +1,19 @@
 import os
+import errno
 import subprocess
 import uuid
 import logging
 import shutil
 import json
 import base64
+import bisect
+import fcntl
+import re
+import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
 import requests
 from pathlib import Path
 from .vm import MicroVM, DEFAULT_KERNEL_PATH, kill_process_tree
@@ -13,8 +21,157 @@ from .image import build_rootfs
 from .network import setup_tap_device, cleanup_tap_device
 import time
 
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when it's missing
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Host-side vsock listener ports handed out by BandSox._allocate_port
+_PORT_RANGE_START = 9000
+_PORT_RANGE_END = 9999
+
+
+# ioctl(2) request that makes the destination share the source's extents
+# (_IOW(0x94, 9, int)); supported by btrfs, XFS and other CoW filesystems.
+_FICLONE = 0x40049409
+
+# Firecracker names the backing file it couldn't open at the end of its
+# snapshot-load error; restore_vm uses these to recreate it as a symlink.
+_MISSING_ROOTFS_RE = re.compile(
+    r"(?:No such file or directory|os error 2).*? (/[\w\-/.]+\.ext4)"
+)
+_TRAILING_ROOTFS_RE = re.compile(r"(/[\w\-/.]+\.ext4)[^}]*$")
+
+# errnos meaning the filesystem can't reflink at all, as opposed to a
+# failure specific to one pair of files.
+_REFLINK_UNSUPPORTED = frozenset({errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL})
+
+
+def _reflink(src, dest) -> None:
+    """Clone ``src`` into a new file at ``dest`` without copying data.
+
+    Raises OSError if the filesystem can't share extents; ``dest`` is
+    removed in that case.
+    """
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dest)
+            raise
+
+
+@lru_cache(maxsize=256)
+def _base_rootfs_name(docker_image: str) -> str:
+    """File name of the shared base rootfs built from ``docker_image``."""
+    return docker_image.replace(":", "_").replace("/", "_") + ".ext4"
+
+
+def _copy_sparse(src, dest) -> None:
+    """Copy ``src`` to ``dest`` inside the kernel, skipping holes.
+
+    Rootfs images are mostly unallocated space. Only the data extents found
+    with SEEK_DATA/SEEK_HOLE are copied (copy_file_range), so the copy stays
+    sparse and costs as much as the data actually in the image.
+    """
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            try:
+                start = os.lseek(in_fd, offset, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO:
+                    break  # only a trailing hole is left
+                raise
+            end = os.lseek(in_fd, start, os.SEEK_HOLE)
+            while start < end:
+                copied = os.copy_file_range(in_fd, out_fd, end - start, start, start)
+                if not copied:
+                    raise OSError(errno.EIO, f"{src} shrank while copying")
+                start += copied
+            offset = end
+        os.ftruncate(out_fd, size)
+    shutil.copystat(src, dest)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize ``obj`` to a single UTF-8 buffer, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _atomic_write(path, data: bytes, durable: bool = False):
+    """Replace ``path`` with ``data`` so readers never observe a partial file.
+
+    The bytes go to a sibling temp file that is then renamed over the target.
+    With ``durable`` the data is fdatasync()ed before the rename, so a crash
+    leaves either the old or the new contents on disk (inode metadata such as
+    mtime is not flushed, which keeps the sync cheap).
+    """
+    path = os.fspath(path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            if durable:
+                os.fdatasync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _json_loads(data):
+    """Parse JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _is_ready_event(line) -> bool:
+    """True if ``line`` is the agent's ``status: ready`` event."""
+    try:
+        event = _json_loads(line)
+    except ValueError:
+        return False
+    if not isinstance(event, dict) or event.get("type") != "status":
+        return False
+    payload = event.get("payload")
+    return isinstance(payload, dict) and payload.get("status") == "ready"
+
+
+def _stat_key(st) -> tuple:
+    """Identity of a file version; atomic replace always changes the inode."""
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_small_file(path) -> bytes:
+    """Read a small file with a single read() call."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, max(os.fstat(fd).st_size, 1))
+    finally:
+        os.close(fd)
+
+
+def _read_json_file(path):
+    """Read and parse a small JSON file with a single read() call."""
+    return _json_loads(_read_small_file(path))
+
 
 class BandSox:
     def __new__(
@@ -74,17 +231,35 @@ class BandSox:
             pass
 
         self.active_vms = {}  # vm_id -> MicroVM instance
+        # Guards active_vms writes; reads use a single dict.get and stay
+        # lock-free.
+        self._active_vms_lock = threading.Lock()
+
+        # Every rootfs lives under storage_dir, so once FICLONE is refused
+        # for lack of support there is no point issuing it again.
+        self._reflink_supported = True
+
+        # Raw metadata bytes for list_vms/list_snapshots, keyed by path and
+        # revalidated against the file's stat (see _cached_json).
+        self._vm_meta_cache = {}
+        self._snapshot_meta_cache = {}
+        # vm_id -> (stat key, raw JSON bytes) for _get_metadata.
+        self._meta_bytes_cache = {}
 
         self.cid_allocator_path = self.storage_dir / "cid_allocator.json"
         self.port_allocator_path = self.storage_dir / "port_allocator.json"
 
         if not self.cid_allocator_path.exists():
-            with open(self.cid_allocator_path, "w") as f:
-                json.dump({"free_cids": [], "next_cid": 3}, f)
+            _atomic_write(
+                self.cid_allocator_path,
+                _json_dumps({"free_cids": [], "next_cid": 3}),
+            )
 
         if not self.port_allocator_path.exists():
-            with open(self.port_allocator_path, "w") as f:
-                json.dump({"next_port": 9000, "used_ports": []}, f)
+            _atomic_write(
+                self.port_allocator_path,
+                _json_dumps({"next_port": _PORT_RANGE_START, "used_ports": []}),
+            )
 
         # Ensure kernel exists or warn with remediation steps
         if not os.path.exists(DEFAULT_KERNEL_PATH):
@@ -93,20 +268,56 @@ class BandSox:
                 "Run 'bandsox init' (or copy a vmlinux file here) before creating VMs."
             )
 
-    def _save_metadata(self, vm_id: str, metadata: dict):
-        import json
-
-        with open(self.metadata_dir / f"{vm_id}.json", "w") as f:
-            json.dump(metadata, f)
+    def _save_metadata(self, vm_id: str, metadata: dict, durable: bool = False):
+        # Status/readiness flips are cheap to lose in a crash; only the
+        # records written when a VM comes into existence ask for fdatasync.
+        path = self.metadata_dir / f"{vm_id}.json"
+        data = _json_dumps(metadata)
+        _atomic_write(path, data, durable=durable)
+        self._meta_bytes_cache[vm_id] = (_stat_key(os.stat(path)), data)
 
     def _get_metadata(self, vm_id: str) -> dict:
-        import json
+        """Parse a VM's metadata, re-reading the file only when it changed.
 
-        meta_path = self.metadata_dir / f"{vm_id}.json"
-        if meta_path.exists():
-            with open(meta_path, "r") as f:
-                return json.load(f)
-        return {}
+        The raw bytes are cached rather than the parsed dict, so every caller
+        still gets a fresh dict it is free to mutate.
+        """
+        path = self.metadata_dir / f"{vm_id}.json"
+        try:
+            key = _stat_key(os.stat(path))
+        except FileNotFoundError:
+            self._meta_bytes_cache.pop(vm_id, None)
+            return {}
+        hit = self._meta_bytes_cache.get(vm_id)
+        if hit is None or hit[0] != key:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                return {}
+            try:
+                st = os.fstat(fd)
+                hit = (_stat_key(st), os.read(fd, max(st.st_size, 1)))
+            finally:
+                os.close(fd)
+            self._meta_bytes_cache[vm_id] = hit
+        return _json_loads(hit[1])
+
+    @staticmethod
+    def _cached_json(cache: dict, seen: dict, path: str) -> dict:
+        """Parse the JSON at ``path``, re-reading the file only on change.
+
+        Metadata is written via atomic replace, so a new inode, mtime or size
+        means new content. Like _get_metadata, the raw bytes are cached and
+        every call parses a fresh dict, so callers can't mutate (nested)
+        cached state. Entries are moved into ``seen`` so files that have
+        disappeared drop out of the cache when the caller swaps it in.
+        """
+        key = _stat_key(os.stat(path))
+        hit = cache.get(path)
+        if hit is None or hit[0] != key:
+            hit = (key, _read_small_file(path))
+        seen[path] = hit
+        return _json_loads(hit[1])
 
     def _best_effort_unblock_guest_rng(self, vm: MicroVM):
         """Inject host entropy into restored guests when CRNG isn't ready.
@@ -177,18 +388,26 @@ class BandSox:
             dest.unlink()
 
         method = "copy"
-        try:
-            subprocess.run(
-                ["cp", "--reflink=always", "--sparse=auto", str(src), str(dest)],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-            )
-            method = "reflink"
-        except Exception as e:
-            logger.debug(f"Reflink clone failed ({e}); falling back to full copy")
-            shutil.copy2(src, dest)
-            method = "copy"
+        if self._reflink_supported:
+            try:
+                # FICLONE directly rather than via `cp --reflink=always`,
+                # which issues the same ioctl after a fork/exec.
+                _reflink(src, dest)
+                method = "reflink"
+            except Exception as e:
+                if isinstance(e, OSError) and e.errno in _REFLINK_UNSUPPORTED:
+                    self._reflink_supported = False
+                logger.debug(f"Reflink clone failed ({e}); falling back to full copy")
+        if method == "copy":
+            try:
+                _copy_sparse(src, dest)
+            except FileNotFoundError:
+                raise
+            except OSError as e:
+                # e.g. EXDEV across filesystems or no SEEK_DATA support;
+                # copy2 -> copyfile still copies in the kernel via sendfile.
+                logger.debug(f"Sparse copy failed ({e}); using a plain copy")
+                shutil.copy2(src, dest)
 
         elapsed = time.time() - start
         logger.info(f"Cloned rootfs to {dest.name} via {method} in {elapsed:.2f}s")
@@ -196,8 +415,7 @@ class BandSox:
 
     def _allocate_cid(self) -> int:
         """Allocates a unique CID for a VM using free-list approach."""
-        with open(self.cid_allocator_path, "r") as f:
-            state = json.load(f)
+        state = _read_json_file(self.cid_allocator_path)
 
         free_cids = state.get("free_cids", [])
         if free_cids:
@@ -207,8 +425,7 @@ class BandSox:
             cid = state["next_cid"]
             state["next_cid"] = cid + 1
 
-        with open(self.cid_allocator_path, "w") as f:
-            json.dump(state, f)
+        _atomic_write(self.cid_allocator_path, _json_dumps(state), durable=True)
 
         logger.debug(f"Allocated CID: {cid}")
         return cid
@@ -216,53 +433,64 @@ class BandSox:
     def _release_cid(self, cid: int):
         """Releases a CID back to the pool using free-list."""
         logger.debug(f"Released CID: {cid}")
-        with open(self.cid_allocator_path, "r") as f:
-            state = json.load(f)
+        state = _read_json_file(self.cid_allocator_path)
 
-        if "free_cids" not in state:
-            state["free_cids"] = []
+        free_cids = state.setdefault("free_cids", [])
 
-        if cid not in state["free_cids"] and cid >= 3:
-            state["free_cids"].append(cid)
-            state["free_cids"].sort()
+        # free_cids is kept sorted, so a binary search both checks for a
+        # duplicate and finds the insertion point without re-sorting
+        idx = bisect.bisect_left(free_cids, cid)
+        if cid >= 3 and (idx == len(free_cids) or free_cids[idx] != cid):
+            free_cids.insert(idx, cid)
 
-        with open(self.cid_allocator_path, "w") as f:
-            json.dump(state, f)
+        _atomic_write(self.cid_allocator_path, _json_dumps(state), durable=True)
 
     def _allocate_port(self) -> int:
-        """Allocates a unique port for vsock communication."""
-        with open(self.port_allocator_path, "r") as f:
-            state = json.load(f)
-
-        # Allocate next port and add to used_ports
-        port = state["next_port"]
-        if port < 10000:
-            state["next_port"] = port + 1
-        else:
-            # Wrap around to 9000
-            port = 9000
-            state["next_port"] = 9001
+        """Allocates a unique port for vsock communication.
+
+        Ports still listed in ``used_ports`` are skipped, so wrapping back to
+        the start of the range never hands out a port that is already taken.
+        """
+        state = _read_json_file(self.port_allocator_path)
+
+        used_ports = state.setdefault("used_ports", [])
+
+        # One byte per port; find() scans for a free slot in C
+        in_use = bytearray(_PORT_RANGE_END - _PORT_RANGE_START + 1)
+        for used in used_ports:
+            if _PORT_RANGE_START <= used <= _PORT_RANGE_END:
+                in_use[used - _PORT_RANGE_START] = 1
+
+        start = state.get("next_port", _PORT_RANGE_START) - _PORT_RANGE_START
+        if not 0 <= start < len(in_use):
+            start = 0
+        slot = in_use.find(0, start)
+        if slot == -1:
+            # Wrap around to the start of the range
+            slot = in_use.find(0, 0, start)
+        if slot == -1:
+            raise RuntimeError(
+                f"No free vsock ports in range {_PORT_RANGE_START}-{_PORT_RANGE_END}"
+            )
+
+        port = _PORT_RANGE_START + slot
+        state["next_port"] = port + 1 if port < _PORT_RANGE_END else _PORT_RANGE_START
 
         # Track this port as in-use
-        if "used_ports" not in state:
-            state["used_ports"] = []
-        state["used_ports"].append(port)
+        used_ports.append(port)
 
-        with open(self.port_allocator_path, "w") as f:
-            json.dump(state, f)
+        _atomic_write(self.port_allocator_path, _json_dumps(state), durable=True)
 
         logger.debug(f"Allocated port: {port}")
         return port
 
     def _release_port(self, port: int):
         """Releases a port back to the pool."""
-        with open(self.port_allocator_path, "r") as f:
-            state = json.load(f)
+        state = _read_json_file(self.port_allocator_path)
 
         if "used_ports" in state and port in state["used_ports"]:
             state["used_ports"].remove(port)
-            with open(self.port_allocator_path, "w") as f:
-                json.dump(state, f)
+            _atomic_write(self.port_allocator_path, _json_dumps(state), durable=True)
             logger.debug(f"Released port: {port}")
 
     def _check_vsock_compatibility(self, vm_id: str):
@@ -287,45 +515,27 @@ class BandSox:
     def update_vm_status(self, vm_id: str, status: str):
         """Updates the status field in the VM metadata."""
         meta = self._get_metadata(vm_id)
-        if meta:
+        # Repeated transitions (e.g. stop on an already stopped VM) don't
+        # need another metadata rewrite.
+        if meta and meta.get("status") != status:
             meta["status"] = status
             self._save_metadata(vm_id, meta)
 
-    def create_vm(
-        self,
-        docker_image: str,
-        name: str = None,
-        vcpu: int = 1,
-        mem_mib: int = 128,
-        kernel_path: str = DEFAULT_KERNEL_PATH,
-        enable_networking: bool = True,
-        enable_vsock: bool = True,
-        force_rebuild: bool = False,
-        disk_size_mib: int = 4096,
-        env_vars: dict = None,
-        metadata: dict = None,
-    ) -> MicroVM:
-        """Creates and starts a new VM from a Docker image."""
-        vm_id = str(uuid.uuid4())
-        logger.info(f"Creating VM {vm_id} from {docker_image}")
-
-        # Validate kernel presence up front for a clearer error
-        if not os.path.exists(kernel_path):
-            raise FileNotFoundError(
-                f"Kernel not found at {kernel_path}. "
-                f"Run 'bandsox init --kernel-output {kernel_path}' or copy a vmlinux "
-                "from the current directory to this path before creating VMs."
-            )
-
-        # 1. Build Rootfs
-        sanitized_name = docker_image.replace(":", "_").replace("/", "_")
-        base_rootfs = self.images_dir / f"{sanitized_name}.ext4"
-
+    def _ensure_base_rootfs(self, docker_image: str, force_rebuild: bool) -> Path:
+        """Returns the base rootfs for docker_image, building it if needed."""
+        base_rootfs = self.images_dir / _base_rootfs_name(docker_image)
         if force_rebuild or not base_rootfs.exists():
             build_rootfs(docker_image, str(base_rootfs))
+        return base_rootfs
 
+    def _prepare_instance_rootfs(
+        self,
+        base_rootfs: Path,
+        instance_rootfs: Path,
+        disk_size_mib: int,
+    ):
+        """Clones the base rootfs for a new VM and grows it to disk_size_mib."""
         # Copy to instance specific path
-        instance_rootfs = self.images_dir / f"{vm_id}.ext4"
         self._clone_rootfs(base_rootfs, instance_rootfs)
 
         # Resize if needed
@@ -358,15 +568,67 @@ class BandSox:
                 # Let's raise to be safe.
                 raise Exception(f"Failed to resize disk: {e}")
 
-        # 2. Create VM instance
+    def create_vm(
+        self,
+        docker_image: str,
+        name: str = None,
+        vcpu: int = 1,
+        mem_mib: int = 128,
+        kernel_path: str = DEFAULT_KERNEL_PATH,
+        enable_networking: bool = True,
+        enable_vsock: bool = True,
+        force_rebuild: bool = False,
+        disk_size_mib: int = 4096,
+        env_vars: dict = None,
+        metadata: dict = None,
+        parallel: bool = False,
+    ) -> MicroVM:
+        """Creates and starts a new VM from a Docker image.
+
+        With parallel=True, Firecracker is started while the instance rootfs
+        is cloned and resized instead of afterwards.
+        """
+        vm_id = str(uuid.uuid4())
+        logger.info(f"Creating VM {vm_id} from {docker_image}")
+
+        # Validate kernel presence up front for a clearer error
+        if not os.path.exists(kernel_path):
+            raise FileNotFoundError(
+                f"Kernel not found at {kernel_path}. "
+                f"Run 'bandsox init --kernel-output {kernel_path}' or copy a vmlinux "
+                "from the current directory to this path before creating VMs."
+            )
+
+        # Build the base image first: that can take minutes or fail on a bad
+        # image name, and no Firecracker process should be waiting on it.
+        base_rootfs = self._ensure_base_rootfs(docker_image, force_rebuild)
+        instance_rootfs = self.images_dir / f"{vm_id}.ext4"
         socket_path = str(self.sockets_dir / f"{vm_id}.sock")
         vm = ManagedMicroVM(vm_id, socket_path, self)
 
-        # 3. Start Process & Configure
         disk_bw = int(os.environ.get("BANDSOX_DISK_BANDWIDTH_MBPS", "200"))
         disk_iops = int(os.environ.get("BANDSOX_DISK_IOPS", "5000"))
 
-        vm.start_process()
+        if parallel:
+            # Spawning Firecracker and waiting for its API socket doesn't
+            # need the rootfs, so it runs while the instance image is cloned
+            # and resized; configure() below needs both.
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fc-start") as pool:
+                started = pool.submit(vm.start_process)
+                try:
+                    self._prepare_instance_rootfs(
+                        base_rootfs, instance_rootfs, disk_size_mib
+                    )
+                except BaseException:
+                    started.exception()  # let the spawn finish before tearing it down
+                    # No metadata exists yet, so only the bare process needs stopping.
+                    MicroVM.stop(vm)
+                    raise
+            started.result()
+        else:
+            self._prepare_instance_rootfs(base_rootfs, instance_rootfs, disk_size_mib)
+            vm.start_process()
+
         vm.configure(
             kernel_path,
             str(instance_rootfs),
@@ -383,8 +645,6 @@ class BandSox:
 
         vm.start()
 
-        import time
-
         vsock_config = None
         if enable_vsock and vm.vsock_enabled:
             vsock_config = {
@@ -414,9 +674,11 @@ class BandSox:
                 "env_vars": env_vars,
                 "metadata": metadata or {},
             },
+            durable=True,
         )
 
-        self.active_vms[vm_id] = vm
+        with self._active_vms_lock:
+            self.active_vms[vm_id] = vm
         return vm
 
     def create_vm_from_dockerfile(
@@ -432,9 +694,6 @@ class BandSox:
         **kwargs,
     ) -> MicroVM:
         """Creates a VM from a Dockerfile."""
-        if not tag:
-            tag = f"bandsox-build-{uuid.uuid4()}"
-
         from .image import build_image_from_dockerfile
 
         # Pass force_rebuild to docker build as explicit nocache?
@@ -442,7 +701,9 @@ class BandSox:
         # But for docker build, we should handle it too.
         nocache = kwargs.get("force_rebuild", False)
 
-        build_image_from_dockerfile(dockerfile_path, tag, nocache=nocache)
+        # Untagged builds come back tagged by image ID, so an unchanged
+        # Dockerfile maps to the base rootfs exported last time.
+        tag = build_image_from_dockerfile(dockerfile_path, tag, nocache=nocache)
 
         return self.create_vm(
             tag,
@@ -476,9 +737,6 @@ class BandSox:
         mem_file_path = mem_path
 
         # Load snapshot metadata to get VM configuration
-        import json
-        import time
-
         snapshot_meta = {}
         meta_file = snap_dir / "metadata.json"
         if meta_file.exists():
@@ -668,9 +926,6 @@ class BandSox:
                 except PermissionError as e:
                     raise Exception(f"Cannot remove stale socket {socket_path}: {e}")
             if detach:
-                import sys
-                import subprocess
-
                 runner_cmd = [
                     sys.executable,
                     "-m",
@@ -734,8 +989,10 @@ class BandSox:
         # Copy snapshot rootfs if available (must do this before starting process potentially?)
         snap_rootfs = snapshot_meta.get("rootfs_path")
         instance_rootfs = self.images_dir / f"{new_vm_id}.ext4"
+        # Stat once; the snapshot's rootfs does not change during a restore.
+        have_snap_rootfs = bool(snap_rootfs) and os.path.isfile(snap_rootfs)
 
-        if snap_rootfs and os.path.exists(snap_rootfs):
+        if have_snap_rootfs:
             self._clone_rootfs(snap_rootfs, instance_rootfs)
             sudo_user = os.environ.get("SUDO_USER")
             if sudo_user and os.geteuid() == 0:
@@ -762,18 +1019,14 @@ class BandSox:
                 guest_mac=guest_mac,
             )
         except Exception as e:
-            import re
-
             msg = str(e)
 
             # Simple regex to catch path at end of string
             # We assume path starts with / and goes to end or "}"
-            match = re.search(
-                r"(?:No such file or directory|os error 2).*? (/[\w\-/.]+\.ext4)", msg
-            )
+            match = _MISSING_ROOTFS_RE.search(msg)
             if not match:
                 # Try matching permission denied too? The user saw os error 2.
-                match = re.search(r"(/[\w\-/.]+\.ext4)[^}]*$", msg)
+                match = _TRAILING_ROOTFS_RE.search(msg)
 
             if match:
                 missing_path = Path(match.group(1))
@@ -832,7 +1085,7 @@ class BandSox:
                     raise e
             else:
                 raise e
-        if snap_rootfs and os.path.exists(snap_rootfs):
+        if have_snap_rootfs:
             # Update rootfs path to the new instance copy (this also frees us from the symlink)
             vm.update_drive("rootfs", str(instance_rootfs))
 
@@ -888,9 +1141,7 @@ class BandSox:
                 if host_ip_for_arp:
                     # Fire-and-forget in a thread so we never block the
                     # restore path on a hung arping.
-                    import threading as _t
-
-                    _t.Thread(
+                    threading.Thread(
                         target=refresh_guest_arp,
                         args=(old_tap_name, host_ip_for_arp),
                         kwargs={"netns_name": netns_name},
@@ -957,9 +1208,11 @@ class BandSox:
                 else snapshot_meta.get("metadata", {}),
                 "vsock_config": vsock_config,
             },
+            durable=True,
         )
 
-        self.active_vms[new_vm_id] = vm
+        with self._active_vms_lock:
+            self.active_vms[new_vm_id] = vm
         return vm
 
     def snapshot_vm(
@@ -1038,17 +1291,22 @@ class BandSox:
                 # Only resume if we paused it
                 vm.resume()
 
-        # Save snapshot metadata including VM configuration
-        import json
-        import shutil
+        # Save snapshot metadata including VM configuration.
+        # pause()/resume() only touch the status field, so the metadata read
+        # above still holds everything the snapshot needs.
+        vm_meta = meta
 
         # Copy rootfs to snapshot directory
-        vm_meta = self._get_metadata(vm.vm_id)
         source_rootfs = Path(vm_meta.get("rootfs_path"))
         snap_rootfs = snap_dir / "rootfs.ext4"
         if source_rootfs.exists():
             self._clone_rootfs(source_rootfs, snap_rootfs)
 
+        try:
+            created_at = os.stat(snapshot_path).st_mtime
+        except FileNotFoundError:
+            created_at = None
+
         snapshot_meta = {
             "snapshot_name": snapshot_name,
             "source_vm_id": vm.vm_id,
@@ -1064,12 +1322,11 @@ class BandSox:
             "metadata": metadata
             if metadata is not None
             else vm_meta.get("metadata", {}),
-            "created_at": os.path.getmtime(str(snapshot_path))
-            if os.path.exists(str(snapshot_path))
-            else None,
+            "created_at": created_at,
         }
-        with open(snap_dir / "metadata.json", "w") as f:
-            json.dump(snapshot_meta, f)
+        _atomic_write(
+            snap_dir / "metadata.json", _json_dumps(snapshot_meta), durable=True
+        )
 
         return snapshot_name
 
@@ -1077,16 +1334,12 @@ class BandSox:
         """Deletes a snapshot."""
         snap_dir = self.snapshots_dir / snapshot_id
         if snap_dir.exists() and snap_dir.is_dir():
-            import shutil
-
             shutil.rmtree(snap_dir)
         else:
             raise FileNotFoundError(f"Snapshot {snapshot_id} not found")
 
     def update_snapshot_metadata(self, snapshot_id: str, metadata: dict) -> dict:
         """Updates the metadata of a snapshot."""
-        import json
-
         snap_dir = self.snapshots_dir / snapshot_id
         if not snap_dir.exists() or not snap_dir.is_dir():
             raise FileNotFoundError(f"Snapshot {snapshot_id} not found")
@@ -1110,8 +1363,6 @@ class BandSox:
 
     def rename_snapshot(self, snapshot_id: str, new_name: str):
         """Renames a snapshot (updates only snapshot_name field, preserving snapshot_id and directory)."""
-        import json
-
         snap_dir = self.snapshots_dir / snapshot_id
         if not snap_dir.exists() or not snap_dir.is_dir():
             raise FileNotFoundError(f"Snapshot {snapshot_id} not found")
@@ -1136,17 +1387,28 @@ class BandSox:
     def list_vms(self, limit: int = None, metadata_equals: dict = None):
         """Lists all VMs (running and stopped)."""
         vms = []
-        for meta_file in self.metadata_dir.glob("*.json"):
-            import json
+        # One listing of the sockets dir instead of a stat() per VM
+        try:
+            live_sockets = set(os.listdir(self.sockets_dir))
+        except FileNotFoundError:
+            live_sockets = set()
+
+        # Sorted by file name so VMs with equal created_at keep a stable order
+        with os.scandir(self.metadata_dir) as it:
+            meta_files = sorted(
+                (e.name, e.path)
+                for e in it
+                if e.name.endswith(".json") and e.is_file(follow_symlinks=False)
+            )
 
+        cache, seen = self._vm_meta_cache, {}
+        for name, meta_file in meta_files:
             try:
-                with open(meta_file, "r") as f:
-                    meta = json.load(f)
+                meta = self._cached_json(cache, seen, meta_file)
 
-                vm_id = meta.get("id")
-                socket_path = self.sockets_dir / f"{vm_id}.sock"
+                vm_id = meta.get("id") or name[:-5]
 
-                if socket_path.exists():
+                if f"{vm_id}.sock" in live_sockets:
                     pass  # Running
                 else:
                     # Socket missing, assume stopped
@@ -1167,6 +1429,7 @@ class BandSox:
                 vms.append(meta)
             except Exception:
                 pass
+        self._vm_meta_cache = seen
 
         # Sort by created_at desc to make limit meaningful
         vms.sort(key=lambda x: x.get("created_at", 0), reverse=True)
@@ -1210,43 +1473,49 @@ class BandSox:
     def list_snapshots(self):
         """Lists all snapshots."""
         snapshots = []
-        for snap_dir in self.snapshots_dir.iterdir():
-            if snap_dir.is_dir():
-                # Try to load metadata.json from the snapshot directory
-                meta_file = snap_dir / "metadata.json"
-                if meta_file.exists():
-                    import json
+        # scandir reuses the d_type from readdir, so is_dir() needs no stat()
+        with os.scandir(self.snapshots_dir) as it:
+            snap_dirs = [e for e in it if e.is_dir(follow_symlinks=False)]
+        snap_dirs.sort(key=attrgetter("name"))
+
+        cache, seen = self._snapshot_meta_cache, {}
+        for snap_dir in snap_dirs:
+            # Stat/open directly rather than probing with exists() first
+            try:
+                meta = self._cached_json(
+                    cache, seen, os.path.join(snap_dir.path, "metadata.json")
+                )
+            except FileNotFoundError:
+                snapshots.append(
+                    {
+                        "id": snap_dir.name,
+                        "path": snap_dir.path,
+                        "status": "no_metadata",
+                    }
+                )
+                continue
+            except json.JSONDecodeError:
+                logger.warning(
+                    f"Could not decode metadata for snapshot {snap_dir.name}"
+                )
+                snapshots.append(
+                    {
+                        "id": snap_dir.name,
+                        "path": snap_dir.path,
+                        "status": "metadata_corrupted",
+                    }
+                )
+                continue
 
-                    try:
-                        with open(meta_file, "r") as f:
-                            meta = json.load(f)
-                        # Ensure id exists
-                        if "id" not in meta:
-                            meta["id"] = meta.get("snapshot_name", snap_dir.name)
-
-                        # Ensure path exists
-                        meta["path"] = str(snap_dir)
-
-                        snapshots.append(meta)
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Could not decode metadata for snapshot {snap_dir.name}"
-                        )
-                        snapshots.append(
-                            {
-                                "id": snap_dir.name,
-                                "path": str(snap_dir),
-                                "status": "metadata_corrupted",
-                            }
-                        )
-                else:
-                    snapshots.append(
-                        {
-                            "id": snap_dir.name,
-                            "path": str(snap_dir),
-                            "status": "no_metadata",
-                        }
-                    )
+            # Ensure id exists
+            if "id" not in meta:
+                meta["id"] = meta.get("snapshot_name", snap_dir.name)
+
+            # Ensure path exists
+            meta["path"] = snap_dir.path
+
+            snapshots.append(meta)
+        self._snapshot_meta_cache = seen
         return snapshots
 
     def delete_vm(self, vm_id: str):
@@ -1265,27 +1534,21 @@ class BandSox:
         except Exception:
             pass
 
-        # 2. Delete socket
-        socket_path = self.sockets_dir / f"{vm_id}.sock"
-        if socket_path.exists():
-            socket_path.unlink()
-
-        # 3. Delete metadata
-        if meta_path.exists():
-            meta_path.unlink()
+        # 2-4. Delete socket, metadata and instance rootfs (missing_ok rather
+        # than an exists() probe before each unlink)
+        (self.sockets_dir / f"{vm_id}.sock").unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        self._meta_bytes_cache.pop(vm_id, None)
+        (self.images_dir / f"{vm_id}.ext4").unlink(missing_ok=True)
 
-        # 4. Delete instance rootfs
-        rootfs_path = self.images_dir / f"{vm_id}.ext4"
-        if rootfs_path.exists():
-            rootfs_path.unlink()
-
-        if vm_id in self.active_vms:
-            del self.active_vms[vm_id]
+        with self._active_vms_lock:
+            self.active_vms.pop(vm_id, None)
 
     def get_vm(self, vm_id: str) -> MicroVM:
         """Gets a running VM instance by ID."""
-        if vm_id in self.active_vms:
-            return self.active_vms[vm_id]
+        vm = self.active_vms.get(vm_id)
+        if vm is not None:
+            return vm
 
         socket_path = self.sockets_dir / f"{vm_id}.sock"
         if not socket_path.exists():
@@ -1648,10 +1911,8 @@ class RemoteMicroVM:
         """
         if not os.path.exists(local_path):
             raise FileNotFoundError(f"Local file not found: {local_path}")
-        import base64 as _b64
-
         with open(local_path, "rb") as f:
-            encoded = _b64.b64encode(f.read()).decode("ascii")
+            encoded = base64.b64encode(f.read()).decode("ascii")
         request_timeout = timeout or self.bandsox.timeout
         self.bandsox._request(
             "POST",
@@ -1727,6 +1988,9 @@ class ManagedMicroVM(MicroVM):
     ):
         super().__init__(vm_id, socket_path, netns=netns)
         self.bandsox = bandsox
+        # Set once agent_ready has been written to metadata, so later
+        # console lines skip the readiness check entirely.
+        self._ready_persisted = False
 
     def _handle_stdout_line(self, line):
         """Override to intercept status events."""
@@ -1738,25 +2002,15 @@ class ManagedMicroVM(MicroVM):
         # But wait, super()._handle_stdout_line calls self.agent_ready = True.
 
         # We need to detect when it BECOMES ready to update metadata
-        if self.agent_ready:
-            # Check if metadata already says running/ready?
-            # We just blindly update for now if it's not marked as ready?
-            # actually "status": "running" is general VM status.
-            # We might need a specific field "agent_ready": true
-
-            # Optimization: don't write to disk on every line.
-            # super() parses the JSON. We should intercept the parsing result?
-            # But _handle_stdout_line does everything.
-
-            # Let's just parse it again or check if agent_ready changed?
-            # No, easier to just check if the line was the ready event.
-            if '"status": "ready"' in line or '"status": "ready"' in line.replace(
-                " ", ""
-            ):
+        if self.agent_ready and not self._ready_persisted:
+            # Cheap substring pre-filter so only candidate lines are parsed
+            # again; the agent may emit compact (orjson) or spaced JSON.
+            if '"ready"' in line and _is_ready_event(line):
                 meta = self.bandsox._get_metadata(self.vm_id)
                 if not meta.get("agent_ready"):
                     meta["agent_ready"] = True
                     self.bandsox._save_metadata(self.vm_id, meta)
+                self._ready_persisted = True
 
     def pause(self):
         # Check if already paused
@@ -1767,7 +2021,11 @@ class ManagedMicroVM(MicroVM):
 
         try:
             super().pause()
-            self.bandsox.update_vm_status(self.vm_id, "paused")
+            # Reuse the metadata read above rather than re-reading it in
+            # update_vm_status.
+            if meta:
+                meta["status"] = "paused"
+                self.bandsox._save_metadata(self.vm_id, meta)
         except Exception as e:
             # Check for connection error indicating VM is gone
             if "Connection refused" in str(e) or isinstance(e, FileNotFoundError):
@@ -1804,12 +2062,14 @@ class ManagedMicroVM(MicroVM):
             kill_process_tree(pid, timeout=1)
 
         super().stop()
-        self.bandsox.update_vm_status(self.vm_id, "stopped")
 
-        meta = self.bandsox._get_metadata(self.vm_id)
-        if meta.get("agent_ready"):
+        # One write for both the status and the readiness reset, based on
+        # the read above.
+        if meta and (meta.get("status") != "stopped" or meta.get("agent_ready")):
+            meta["status"] = "stopped"
             meta["agent_ready"] = False
             self.bandsox._save_metadata(self.vm_id, meta)
+        self._ready_persisted = False
 
     def wait_for_agent(self, timeout=30):
         """Waits for the agent to be ready and connected."""
@@ -1841,7 +2101,14 @@ class ManagedMicroVM(MicroVM):
                     self.agent_ready = True
                     return True
 
-            time.sleep(0.5)
+            # Wake as soon as our console reader sees the ready event; the
+            # timeout only paces the metadata check for readiness recorded
+            # by another process. Once the event has fired we are only
+            # waiting for a console connection, so pace that normally.
+            if self._agent_ready_event.is_set():
+                time.sleep(0.5)
+            else:
+                self._agent_ready_event.wait(0.5)
 
         return False
 
@@ -147,9 +147,15 @@ class FirecrackerClient:
         return self._request("PUT", "/snapshot/create", data)
 
     def load_snapshot(self, snapshot_path: str, mem_file_path: str):
+        # With the "File" backend Firecracker maps the memory file
+        # MAP_PRIVATE and faults pages in on demand, so restore cost tracks
+        # the pages the guest touches rather than the snapshot size.
         data = {
             "snapshot_path": snapshot_path,
-            "mem_file_path": mem_file_path,
+            "mem_backend": {
+                "backend_type": "File",
+                "backend_path": mem_file_path,
+            },
             "enable_diff_snapshots": False,
             "resume_vm": False,
         }
@@ -9,7 +9,8 @@ logger = logging.getLogger(__name__)
 
 def run_command(cmd, check=True, capture_output=True, cwd=None, env=None):
     """Helper to run shell commands."""
-    logger.debug(f"Running command: {' '.join(cmd)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Running command: %s", " ".join(cmd))
     try:
         result = subprocess.run(
             cmd,
@@ -163,8 +164,14 @@ EOF
     logger.info(f"Rootfs created at {output_path}")
     return str(output_path)
 
-def build_image_from_dockerfile(dockerfile_path: str, tag: str, nocache: bool = False):
-    """Builds a Docker image from a Dockerfile using Docker SDK."""
+def build_image_from_dockerfile(dockerfile_path: str, tag: str = None, nocache: bool = False):
+    """Builds a Docker image from a Dockerfile using Docker SDK.
+
+    Without a ``tag`` the image is tagged by its content
+    (``bandsox-build:<image id>``), so rebuilding an unchanged Dockerfile
+    yields the same tag and create_vm reuses the base rootfs it already
+    exported instead of building a new one.
+    """
     import docker
     client = docker.from_env()
     
@@ -172,16 +179,21 @@ def build_image_from_dockerfile(dockerfile_path: str, tag: str, nocache: bool =
     if not dockerfile_path.exists():
         raise FileNotFoundError(f"Dockerfile not found at {dockerfile_path}")
     
-    logger.info(f"Building Docker image {tag} from {dockerfile_path}")
+    logger.info(f"Building Docker image {tag or '(content-addressed)'} from {dockerfile_path}")
     
     # docker-py build expects 'path' to directory containing Dockerfile
     # and 'dockerfile' arg if filename is not Dockerfile
     if dockerfile_path.is_file():
         path = str(dockerfile_path.parent)
         dockerfile = dockerfile_path.name
-        client.images.build(path=path, dockerfile=dockerfile, tag=tag, rm=True, nocache=nocache)
+        image, _ = client.images.build(path=path, dockerfile=dockerfile, tag=tag, rm=True, nocache=nocache)
     else:
         path = str(dockerfile_path)
-        client.images.build(path=path, tag=tag, rm=True, nocache=nocache)
+        image, _ = client.images.build(path=path, tag=tag, rm=True, nocache=nocache)
+
+    if not tag:
+        digest = image.id.split(":", 1)[-1][:16]
+        image.tag("bandsox-build", digest)
+        tag = f"bandsox-build:{digest}"
         
     return tag
@@ -1,12 +1,50 @@
 import subprocess
 import logging
+import json
+import os
+import re
+import shutil
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from pyroute2 import IPRoute, NetlinkError
+except ImportError:  # optional (the "netlink" extra); link changes shell out to `sudo ip`
+    IPRoute = None
 
 logger = logging.getLogger(__name__)
 
+# sudo's usual secure_path. Programs that sudo runs as root are only looked
+# up here (root-owned system dirs), never on the caller's own PATH.
+_SECURE_PATH = "/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"
+
+@lru_cache(maxsize=None)
+def _program_path(name: str, secure: bool = False) -> str:
+    """Absolute path of a helper program, or the bare name if not found."""
+    return shutil.which(name, path=_SECURE_PATH if secure else None) or name
+
+def _qualify(cmd):
+    """Resolve cmd's program (and the one run under sudo) to absolute paths once."""
+    cmd = list(cmd)
+    if not os.path.dirname(cmd[0]):
+        cmd[0] = _program_path(cmd[0])
+    if os.path.basename(cmd[0]) == "sudo" and len(cmd) > 1 and not os.path.dirname(cmd[1]) and not cmd[1].startswith("-"):
+        cmd[1] = _program_path(cmd[1], secure=True)
+    return cmd
+
 def run_command(cmd, check=True):
-    logger.debug(f"Running command: {' '.join(cmd)}")
-    return subprocess.run(cmd, check=check)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Running command: %s", " ".join(cmd))
+    # With an absolute program path and close_fds=False, subprocess starts
+    # the child with posix_spawn (vfork) rather than fork()ing a copy of
+    # this process's page tables. close_fds=False is safe: every fd Python
+    # opens is already non-inheritable (PEP 446). Resolving the program
+    # under sudo as well spares sudo its own PATH search on every call.
+    return subprocess.run(_qualify(cmd), check=check, close_fds=False)
 
 
 def derive_host_mac(host_ip: str) -> str:
@@ -38,7 +76,7 @@ def derive_host_mac(host_ip: str) -> str:
     return f"{b0:02x}:{h[1]:02x}:{h[2]:02x}:{h[3]:02x}:{h[4]:02x}:{h[5]:02x}".upper()
 
 
-def _send_gratuitous_arp(tap_name: str, host_ip: str, netns_name: str = None, count: int = 3):
+def _send_gratuitous_arp(tap_name: str, host_ip: str, netns_name: str = None, count: int = 3, wait: bool = True):
     """Pushes gratuitous ARPs for host_ip out of tap_name.
 
     Refreshes the guest's stale gateway ARP entry after a snapshot restore
@@ -50,6 +88,9 @@ def _send_gratuitous_arp(tap_name: str, host_ip: str, netns_name: str = None, co
     window where the guest's network stack is still coming back up after
     a snapshot resume — a single packet sent before resume gets dropped
     on the floor.
+
+    With wait=False the running arping is returned instead (or None if it
+    could not start); hand it to _reap_arping() once other work is done.
     """
     base = ["sudo"]
     if netns_name:
@@ -63,15 +104,25 @@ def _send_gratuitous_arp(tap_name: str, host_ip: str, netns_name: str = None, co
         "-I", tap_name, host_ip,
     ]
     try:
-        subprocess.run(
-            cmd,
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            timeout=count + 3,
-        )
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except Exception as e:
         logger.debug(f"Gratuitous ARP for {host_ip} on {tap_name} skipped: {e}")
+        return None
+    if not wait:
+        return proc
+    _reap_arping(proc, count)
+    return None
+
+
+def _reap_arping(proc, count: int = 3):
+    """Wait for an arping started with wait=False, killing it if it hangs."""
+    if proc is None:
+        return
+    try:
+        proc.wait(timeout=count + 3)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
 
 
 def refresh_guest_arp(tap_name: str, host_ip: str, netns_name: str = None):
@@ -86,45 +137,249 @@ def refresh_guest_arp(tap_name: str, host_ip: str, netns_name: str = None):
     """
     _send_gratuitous_arp(tap_name, host_ip, netns_name=netns_name)
 
+# The default route rarely changes while we run, so lookups are reused for a
+# short while instead of costing a read (or an `ip` exec) per TAP setup and
+# teardown. Routing changes are picked up once the entry expires.
+_DEFAULT_IFACE_TTL = 30.0
+_default_iface_cache = (None, 0.0)  # (interface, expiry on time.monotonic())
+_PROC_NET_ROUTE = "/proc/net/route"
+_ROUTE_DEV_RE = re.compile(rb"\bdev\s+(\S+)")
+
+
+def _default_interface_from_proc():
+    """Interface of the lowest-metric IPv4 default route in /proc/net/route."""
+    best = None
+    with open(_PROC_NET_ROUTE) as f:
+        next(f, None)  # header
+        for line in f:
+            fields = line.split()
+            # Iface Destination Gateway Flags RefCnt Use Metric Mask ...
+            if len(fields) < 8 or fields[1] != "00000000" or fields[7] != "00000000":
+                continue
+            if not int(fields[3], 16) & 0x1:  # RTF_UP
+                continue
+            metric = int(fields[6])
+            if best is None or metric < best[0]:
+                best = (metric, fields[0])
+    return best[1] if best else None
+
+
 def get_default_interface():
     """Get the default network interface with internet access."""
-    # Simple heuristic: look for default route
+    global _default_iface_cache
+    iface, expiry = _default_iface_cache
+    if iface and time.monotonic() < expiry:
+        return iface
+
     try:
-        result = subprocess.run(["ip", "route", "show", "default"], capture_output=True, text=True)
-        # Output format: default via 192.168.1.1 dev eth0 proto dhcp ...
-        parts = result.stdout.split()
-        if "dev" in parts:
-            idx = parts.index("dev")
-            return parts[idx + 1]
-    except Exception as e:
-        logger.error(f"Failed to get default interface: {e}")
-    return "eth0" # Fallback
+        iface = _default_interface_from_proc()
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not read /proc/net/route: {e}")
+        iface = None
 
-def setup_tap_device(tap_name: str, host_ip: str, cidr: int = 24, host_mac: str = None):
+    if not iface:
+        # Simple heuristic: look for default route
+        try:
+            result = subprocess.run(["ip", "route", "show", "default"], capture_output=True)
+            # Output format: default via 192.168.1.1 dev eth0 proto dhcp ...
+            match = _ROUTE_DEV_RE.search(result.stdout)
+            if match:
+                iface = match.group(1).decode()
+        except Exception as e:
+            logger.error(f"Failed to get default interface: {e}")
+
+    if not iface:
+        return "eth0" # Fallback
+    _default_iface_cache = (iface, time.monotonic() + _DEFAULT_IFACE_TTL)
+    return iface
+
+def invalidate_default_interface():
+    """Forget the cached default interface, e.g. after the host's routes change."""
+    global _default_iface_cache
+    _default_iface_cache = (None, 0.0)
+
+def _apply_iptables_rules(rules):
+    """Apply (table, chain, op, spec) rules in one iptables-restore transaction.
+
+    ``op`` is the iptables action with its arguments (["-A"], ["-I", "1"],
+    ["-D"], ...). Falls back to one iptables call per rule if
+    iptables-restore is missing or rejects the batch. Returns True only if
+    every rule was applied.
     """
-    Creates and configures a TAP device.
-    
-    Args:
-        tap_name: Name of the TAP device (e.g., 'tap0')
-        host_ip: IP address to assign to the TAP device on the host (gateway for VM)
-        cidr: Network mask (e.g., 24)
-        host_mac: Optional MAC to pin on the TAP. Derived from host_ip if not given.
-            Pinning a stable MAC is required for snapshot restore — otherwise
-            the new TAP gets a random MAC and the guest's cached gateway ARP
-            entry from snapshot points to the OLD MAC, dropping packets.
+    script = []
+    for table in dict.fromkeys(table for table, _, _, _ in rules):
+        script.append(f"*{table}")
+        for rule_table, chain, op, spec in rules:
+            if rule_table == table:
+                script.append(" ".join([op[0], chain, *op[1:], *spec]))
+        script.append("COMMIT")
+    try:
+        result = subprocess.run(
+            ["sudo", "iptables-restore", "--noflush"],
+            input="\n".join(script) + "\n",
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 0:
+            return True
+        logger.debug(f"iptables-restore failed, applying rules one by one: {result.stderr}")
+    except OSError as e:
+        logger.debug(f"iptables-restore unavailable, applying rules one by one: {e}")
+    ok = True
+    for table, chain, op, spec in rules:
+        result = run_command(["sudo", "iptables", "-t", table, op[0], chain, *op[1:], *spec], check=False)
+        if result.returncode != 0:
+            ok = False
+    return ok
 
-    Returns:
-        The MAC address that was set on the TAP.
+
+_PROC_IP_FORWARD = "/proc/sys/net/ipv4/ip_forward"
+
+
+def _enable_ip_forward():
+    """Turn on IPv4 forwarding, skipping the `sudo sysctl` exec when possible.
+
+    The proc file is world-readable, so an already-enabled host costs one
+    read; root writes it directly.
     """
-    if not host_mac:
-        host_mac = derive_host_mac(host_ip)
+    try:
+        with open(_PROC_IP_FORWARD) as f:
+            if f.read().strip() == "1":
+                return
+        if os.geteuid() == 0:
+            with open(_PROC_IP_FORWARD, "w") as f:
+                f.write("1")
+            return
+    except OSError as e:
+        logger.debug(f"Cannot use {_PROC_IP_FORWARD} directly: {e}")
+    run_command(["sudo", "sysctl", "-w", "net.ipv4.ip_forward=1"])
 
-    logger.info(f"Setting up TAP device {tap_name} with IP {host_ip}/{cidr} mac {host_mac}")
 
-    # Create TAP device
-    # We need to set the user to the current user so Firecracker (running as user) can open it
-    import os
-    user = os.environ.get("SUDO_USER", os.environ.get("USER", "rc"))
+def _tap_firewall_rules(tap_name: str, ext_if: str):
+    """(table, chain, how to add, rule spec) for NAT through a host TAP.
+
+    The first two rules are shared by every TAP; the rest mention
+    ``tap_name`` and are removed again by cleanup_tap_device.
+    """
+    return [
+        # Masquerade (NAT)
+        ("nat", "POSTROUTING", ["-A"], ["-o", ext_if, "-j", "MASQUERADE"]),
+        # Conntrack
+        ("filter", "FORWARD", ["-I"], ["-m", "conntrack", "--ctstate", "RELATED,ESTABLISHED", "-j", "ACCEPT"]),
+        # Forward TAP
+        ("filter", "FORWARD", ["-I"], ["-i", tap_name, "-o", ext_if, "-j", "ACCEPT"]),
+        # Allow Host -> VM (and established return traffic)
+        # We need to allow packets destined to the TAP device
+        ("filter", "FORWARD", ["-I"], ["-o", tap_name, "-j", "ACCEPT"]),
+        # Clamp TCP MSS to the path MTU. This prevents a common PMTUD
+        # blackhole when the host egress path has MTU < 1500 (e.g. VPN /
+        # overlay). Without clamping, the guest advertises MSS=1460 and
+        # remote servers may send packets that are too large and get
+        # dropped, making the *first* HTTPS request hang until TCP
+        # blackhole detection kicks in.
+        #
+        # We clamp on forwarded SYN packets from TAP -> ext_if.
+        ("mangle", "FORWARD", ["-I", "1"], [
+            "-i", tap_name, "-o", ext_if,
+            "-p", "tcp", "--tcp-flags", "SYN,RST", "SYN",
+            "-j", "TCPMSS", "--clamp-mss-to-pmtu",
+        ]),
+    ]
+
+
+def _ipv4_address_owner(ip: str):
+    """Return the interface holding IPv4 address ``ip``, or None."""
+    result = subprocess.run(["ip", "-json", "-4", "addr", "list"], capture_output=True, text=True)
+    if result.returncode == 0:
+        try:
+            ifaces = json.loads(result.stdout) if result.stdout.strip() else []
+        except ValueError:
+            ifaces = None
+        if ifaces is not None:
+            for iface in ifaces:
+                for addr in iface.get("addr_info", ()):
+                    if addr.get("local") == ip:
+                        return iface.get("ifname")
+            return None
+
+    # iproute2 without -json support: one "N: dev inet a.b.c.d/nn ..." per line
+    out = subprocess.run(["ip", "-o", "-4", "addr", "list"], capture_output=True, text=True).stdout
+    for line in out.splitlines():
+        if f" {ip}/" in line:
+            return line.split()[1]
+    return None
+
+
+def _netlink_usable():
+    """Whether TAP links can be managed over rtnetlink in this process.
+
+    Netlink needs CAP_NET_ADMIN in the calling process itself, so this only
+    applies when BandSox runs as root; otherwise each change has to go
+    through its own `sudo ip` exec.
+    """
+    return IPRoute is not None and os.geteuid() == 0
+
+
+# One rtnetlink socket for the whole process, opened on first use; callers
+# take the lock so requests and replies on it don't interleave.
+_ipr = None
+_ipr_lock = threading.Lock()
+
+
+@contextmanager
+def _netlink():
+    """Yield the shared IPRoute handle, reopening it if it broke."""
+    global _ipr
+    with _ipr_lock:
+        if _ipr is None:
+            _ipr = IPRoute()
+        try:
+            yield _ipr
+        except OSError:
+            _ipr.close()
+            _ipr = None
+            raise
+
+
+def _setup_tap_link_netlink(tap_name: str, host_ip: str, cidr: int, host_mac: str, user: str):
+    """Netlink version of the `ip tuntap add` / `ip link` / `ip addr` steps."""
+    import pwd
+
+    try:
+        pw = pwd.getpwnam(user)
+        owner = {"uid": pw.pw_uid, "gid": pw.pw_gid}
+    except KeyError:
+        owner = {}
+
+    with _netlink() as ipr:
+        try:
+            ipr.link("add", ifname=tap_name, kind="tuntap", mode="tap", **owner)
+        except NetlinkError as e:
+            logger.warning(f"Failed to create TAP {tap_name} ({e}). Continuing...")
+        idx = ipr.link_lookup(ifname=tap_name)
+        if not idx:
+            raise Exception(f"TAP {tap_name} does not exist")
+        idx = idx[0]
+
+        try:
+            ipr.link("set", index=idx, address=host_mac)
+        except NetlinkError as e:
+            logger.warning(f"Failed to set MAC {host_mac} on {tap_name}: {e}")
+
+        # Collision check on the same socket instead of an `ip -json` exec.
+        owners = [m["index"] for m in ipr.get_addr(family=socket.AF_INET, address=host_ip)]
+        if owners and owners[0] != idx:
+            dev_name = ipr.get_links(owners[0])[0].get_attr("IFLA_IFNAME")
+            raise Exception(f"IP {host_ip} already assigned to {dev_name}")
+        if not owners:
+            try:
+                ipr.addr("add", index=idx, address=host_ip, prefixlen=cidr)
+            except NetlinkError as e:
+                raise Exception(f"Failed to assign IP {host_ip} to {tap_name}: {e}")
+
+        ipr.link("set", index=idx, state="up")
+
+def _setup_tap_link_shell(tap_name: str, host_ip: str, cidr: int, host_mac: str, user: str):
     try:
         run_command(["sudo", "ip", "tuntap", "add", "dev", tap_name, "mode", "tap", "user", user, "group", user])
     except subprocess.CalledProcessError:
@@ -140,18 +395,10 @@ def setup_tap_device(tap_name: str, host_ip: str, cidr: int = 24, host_mac: str
     
     # Set IP
     # Check for global IP collision
-    current_ips_out = subprocess.run(["ip", "-o", "-4", "addr", "list"], capture_output=True, text=True).stdout
-    for line in current_ips_out.splitlines():
-        if f" {host_ip}/" in line:
-            # Line format: 2: eth0    inet 172.16.x.1/24 ...
-            parts = line.split()
-            dev_name = parts[1]
-            if dev_name != tap_name:
-                raise Exception(f"IP {host_ip} already assigned to {dev_name}")
-            else:
-                # Already assigned to this device, skip add
-                break
-    else:
+    dev_name = _ipv4_address_owner(host_ip)
+    if dev_name is not None and dev_name != tap_name:
+        raise Exception(f"IP {host_ip} already assigned to {dev_name}")
+    if dev_name is None:
         # Not found, add it
         try:
             run_command(["sudo", "ip", "addr", "add", f"{host_ip}/{cidr}", "dev", tap_name])
@@ -161,64 +408,95 @@ def setup_tap_device(tap_name: str, host_ip: str, cidr: int = 24, host_mac: str
     # Bring up
     run_command(["sudo", "ip", "link", "set", tap_name, "up"])
 
-    # Push a gratuitous ARP so the guest (which may be restoring from a
-    # snapshot taken against a previous instance of this TAP) updates its
-    # gateway ARP entry immediately.
-    _send_gratuitous_arp(tap_name, host_ip)
+def _missing_iptables_rules(rules):
+    """Return the rules `iptables -C` doesn't find, probing them concurrently.
+
+    Each probe is its own sudo+iptables exec; they're independent, so they
+    overlap instead of running back to back. -w makes them queue on the
+    xtables lock rather than fail (and read as "missing") when they collide.
+    """
+    def probe(rule):
+        table, chain, _, spec = rule
+        return run_command(["sudo", "iptables", "-w", "-t", table, "-C", chain, *spec], check=False).returncode != 0
+
+    with ThreadPoolExecutor(max_workers=len(rules)) as pool:
+        found_missing = list(pool.map(probe, rules))
+    return [rule for rule, is_missing in zip(rules, found_missing) if is_missing]
 
+# TAP name -> uplink whose firewall rules this process has installed for it;
+# cleanup_tap_device forgets the TAP when it removes them.
+_tap_nat_installed = {}
+
+def _setup_tap_forwarding(tap_name: str):
+    """Enable forwarding and NAT for traffic leaving through tap_name."""
     # Enable IP forwarding
-    run_command(["sudo", "sysctl", "-w", "net.ipv4.ip_forward=1"])
+    _enable_ip_forward()
     
     # Setup NAT (Masquerading)
     ext_if = get_default_interface()
     logger.info(f"Enabling NAT on interface {ext_if}")
     
+    # This process already installed the rules for this TAP and uplink;
+    # skip re-probing them with iptables -C.
+    if _tap_nat_installed.get(tap_name) == ext_if:
+        return
+
     # Check and add firewall rules
     try:
-        # Masquerade (NAT)
-        run_command(["sudo", "iptables", "-t", "nat", "-C", "POSTROUTING", "-o", ext_if, "-j", "MASQUERADE"], check=False)
-        if run_command(["sudo", "iptables", "-t", "nat", "-C", "POSTROUTING", "-o", ext_if, "-j", "MASQUERADE"], check=False).returncode != 0:
-             run_command(["sudo", "iptables", "-t", "nat", "-A", "POSTROUTING", "-o", ext_if, "-j", "MASQUERADE"])
-        
-        # Conntrack
-        if run_command(["sudo", "iptables", "-C", "FORWARD", "-m", "conntrack", "--ctstate", "RELATED,ESTABLISHED", "-j", "ACCEPT"], check=False).returncode != 0:
-            run_command(["sudo", "iptables", "-I", "FORWARD", "-m", "conntrack", "--ctstate", "RELATED,ESTABLISHED", "-j", "ACCEPT"])
-            
-        # Forward TAP
-        if run_command(["sudo", "iptables", "-C", "FORWARD", "-i", tap_name, "-o", ext_if, "-j", "ACCEPT"], check=False).returncode != 0:
-            run_command(["sudo", "iptables", "-I", "FORWARD", "-i", tap_name, "-o", ext_if, "-j", "ACCEPT"])
-            
-        # Allow Host -> VM (and established return traffic)
-        # We need to allow packets destined to the TAP device
-        if run_command(["sudo", "iptables", "-C", "FORWARD", "-o", tap_name, "-j", "ACCEPT"], check=False).returncode != 0:
-             run_command(["sudo", "iptables", "-I", "FORWARD", "-o", tap_name, "-j", "ACCEPT"])
+        # (table, chain, how to add, rule spec). Everything missing is added
+        # in a single atomic iptables-restore instead of one iptables exec
+        # per rule.
+        missing = _missing_iptables_rules(_tap_firewall_rules(tap_name, ext_if))
+        # Only remember the TAP once every rule is really in place, so a
+        # failed install gets probed and retried on the next setup.
+        if not missing or _apply_iptables_rules(missing):
+            _tap_nat_installed[tap_name] = ext_if
+        else:
+            logger.warning(f"Some firewall rules for {tap_name} could not be added")
 
-        # Clamp TCP MSS to the path MTU. This prevents a common PMTUD
-        # blackhole when the host egress path has MTU < 1500 (e.g. VPN /
-        # overlay). Without clamping, the guest advertises MSS=1460 and
-        # remote servers may send packets that are too large and get
-        # dropped, making the *first* HTTPS request hang until TCP
-        # blackhole detection kicks in.
-        #
-        # We clamp on forwarded SYN packets from TAP -> ext_if.
-        mss_check = [
-            "sudo", "iptables", "-t", "mangle", "-C", "FORWARD",
-            "-i", tap_name, "-o", ext_if,
-            "-p", "tcp", "--tcp-flags", "SYN,RST", "SYN",
-            "-j", "TCPMSS", "--clamp-mss-to-pmtu",
-        ]
-        mss_insert = [
-            "sudo", "iptables", "-t", "mangle", "-I", "FORWARD", "1",
-            "-i", tap_name, "-o", ext_if,
-            "-p", "tcp", "--tcp-flags", "SYN,RST", "SYN",
-            "-j", "TCPMSS", "--clamp-mss-to-pmtu",
-        ]
-        if run_command(mss_check, check=False).returncode != 0:
-            run_command(mss_insert, check=False)
-            
     except Exception as e:
         logger.warning(f"iptables setup failed (might already exist or permission denied): {e}")
 
+def setup_tap_device(tap_name: str, host_ip: str, cidr: int = 24, host_mac: str = None):
+    """
+    Creates and configures a TAP device.
+    
+    Args:
+        tap_name: Name of the TAP device (e.g., 'tap0')
+        host_ip: IP address to assign to the TAP device on the host (gateway for VM)
+        cidr: Network mask (e.g., 24)
+        host_mac: Optional MAC to pin on the TAP. Derived from host_ip if not given.
+            Pinning a stable MAC is required for snapshot restore — otherwise
+            the new TAP gets a random MAC and the guest's cached gateway ARP
+            entry from snapshot points to the OLD MAC, dropping packets.
+
+    Returns:
+        The MAC address that was set on the TAP.
+    """
+    if not host_mac:
+        host_mac = derive_host_mac(host_ip)
+
+    logger.info(f"Setting up TAP device {tap_name} with IP {host_ip}/{cidr} mac {host_mac}")
+
+    # Create TAP device
+    # We need to set the user to the current user so Firecracker (running as user) can open it
+    user = os.environ.get("SUDO_USER", os.environ.get("USER", "rc"))
+    if _netlink_usable():
+        _setup_tap_link_netlink(tap_name, host_ip, cidr, host_mac, user)
+    else:
+        _setup_tap_link_shell(tap_name, host_ip, cidr, host_mac, user)
+
+    # Push a gratuitous ARP so the guest (which may be restoring from a
+    # snapshot taken against a previous instance of this TAP) updates its
+    # gateway ARP entry immediately. arping spends ~count seconds pacing
+    # its packets, so the forwarding and firewall setup below run while it
+    # does and it is only reaped at the end.
+    arping = _send_gratuitous_arp(tap_name, host_ip, wait=False)
+    try:
+        _setup_tap_forwarding(tap_name)
+    finally:
+        _reap_arping(arping)
+
     return host_mac
 
 
@@ -229,7 +507,6 @@ def setup_netns_networking(netns_name: str, tap_name: str, host_ip: str, vm_id:
     host_mac, if not provided, is derived from host_ip. Pinning a stable
     MAC matters on snapshot restore (see derive_host_mac docstring).
     """
-    import os
     from .cni import CNIRuntime
 
     user = os.environ.get("SUDO_USER", os.environ.get("USER", "rc"))
@@ -442,9 +719,22 @@ def cleanup_tap_device(tap_name: str, netns_name: str = None, vm_id: str = None,
     else:
         logger.info(f"Cleaning up TAP device {tap_name}")
         try:
-            run_command(["sudo", "ip", "tuntap", "del", "dev", tap_name, "mode", "tap"], check=False)
+            if _netlink_usable():
+                with _netlink() as ipr:
+                    try:
+                        ipr.link("del", ifname=tap_name)
+                    except NetlinkError as e:
+                        logger.debug(f"TAP {tap_name} not removed: {e}")
+            else:
+                run_command(["sudo", "ip", "tuntap", "del", "dev", tap_name, "mode", "tap"], check=False)
+            # Drop every rule setup_tap_device added for this TAP, so the
+            # FORWARD and mangle chains don't grow with each VM ever run.
+            _tap_nat_installed.pop(tap_name, None)
             ext_if = get_default_interface()
-            run_command(["sudo", "iptables", "-D", "FORWARD", "-i", tap_name, "-o", ext_if, "-j", "ACCEPT"], check=False)
+            _apply_iptables_rules([
+                (table, chain, ["-D"], spec)
+                for table, chain, _, spec in _tap_firewall_rules(tap_name, ext_if)[2:]
+            ])
         except Exception as e:
             logger.error(f"Error cleaning up TAP device: {e}")
 
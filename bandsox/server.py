@@ -763,9 +763,18 @@ async def terminal_endpoint(websocket: WebSocket, vm_id: str, cols: int = 80, ro
 
     try:
         while True:
-            data = await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("bytes")
+            if raw is not None:
+                # Binary frames carry raw terminal input; no JSON envelope.
+                vm.send_session_input(
+                    session_id, base64.b64encode(raw).decode("ascii"), encoding="base64"
+                )
+                continue
             try:
-                msg = json.loads(data)
+                msg = json.loads(message.get("text") or "")
                 if msg["type"] == "input":
                     # Input is base64 encoded from client
                     vm.send_session_input(session_id, msg["data"], encoding="base64")
@@ -7,6 +7,8 @@ import uuid
 import threading
 import json
 import socket
+import select
+import signal
 import shlex
 import base64
 import tempfile
@@ -15,8 +17,21 @@ from .firecracker import FirecrackerClient
 from .network import setup_tap_device, cleanup_tap_device, derive_host_mac
 import requests
 
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when it's missing
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+
+def _json_loads(data):
+    """Parse JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 _DIRECT_TEXT_WRITE_MAX_BYTES = 2 * 1024  # ~2 KiB
 # Anything bigger goes through _write_bytes which prefers the fastwrite
 # RPC (vsock). The previous 512 KiB threshold pushed athena's typical
@@ -100,41 +115,106 @@ def _descendant_pids(pid: int) -> list:
     return descendants
 
 
+_HAS_PIDFD = hasattr(os, "pidfd_open") and hasattr(signal, "pidfd_send_signal")
+
+
+def _open_pidfd(pid: int):
+    """Return a pidfd for ``pid``, None if pidfds are unavailable.
+
+    Raises ProcessLookupError if the process is already gone.
+    """
+    if not _HAS_PIDFD:
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:
+        return None  # e.g. kernel older than 5.3
+
+
+def _signal_target(target: int, pidfd, sig) -> None:
+    try:
+        if pidfd is not None:
+            signal.pidfd_send_signal(pidfd, sig)
+        else:
+            os.kill(target, sig)
+    except ProcessLookupError:
+        pass
+    except PermissionError:
+        logger.error(f"Permission denied sending {sig.name} to PID {target}")
+
+
+def _has_exited(target: int, pidfd) -> bool:
+    if pidfd is None:
+        return not _pid_exists(target)
+    poller = select.poll()
+    poller.register(pidfd, select.POLLIN)
+    return bool(poller.poll(0))
+
+
+def _wait_for_exit(handles: list, timeout: float) -> bool:
+    """Wait until every (pid, pidfd) in ``handles`` has exited."""
+    deadline = time.monotonic() + timeout
+    pending = handles
+    while True:
+        pending = [h for h in pending if not _has_exited(*h)]
+        if not pending:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if all(pidfd is not None for _, pidfd in pending):
+            # A pidfd turns readable the moment its process exits (zombies
+            # included), so this returns as soon as the tree is down.
+            poller = select.poll()
+            for _, pidfd in pending:
+                poller.register(pidfd, select.POLLIN)
+            poller.poll(remaining * 1000)
+        else:
+            time.sleep(min(0.05, remaining))
+
+
 def kill_process_tree(pid: int, timeout: float = 1.0):
     """Terminate a process and any descendants, escalating to SIGKILL.
 
     Firecracker may be started through wrappers such as sudo/ip-netns/nsenter.
     Killing only the wrapper can leave the real firecracker process orphaned,
     so stop paths should tear down the whole tree rooted at the recorded PID.
-    """
-    import signal
 
+    Where the kernel supports it, each process is pinned with a pidfd before
+    it is signalled, so a recycled PID is never hit and the wait ends as soon
+    as the processes exit.
+    """
     if not pid or pid == os.getpid():
         return
 
-    targets = list(reversed(_descendant_pids(pid))) + [pid]
-    for target in targets:
-        try:
-            os.kill(target, signal.SIGTERM)
-        except ProcessLookupError:
-            pass
-        except PermissionError:
-            logger.error(f"Permission denied sending SIGTERM to PID {target}")
+    pidfds = {}
 
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        if not any(_pid_exists(target) for target in targets):
+    def handles():
+        found = []
+        for target in list(reversed(_descendant_pids(pid))) + [pid]:
+            if target not in pidfds:
+                try:
+                    pidfds[target] = _open_pidfd(target)
+                except ProcessLookupError:
+                    continue
+            found.append((target, pidfds[target]))
+        return found
+
+    try:
+        for target, pidfd in handles():
+            _signal_target(target, pidfd, signal.SIGTERM)
+
+        if _wait_for_exit(list(pidfds.items()), timeout):
             return
-        time.sleep(0.05)
 
-    targets = list(reversed(_descendant_pids(pid))) + [pid]
-    for target in targets:
-        try:
-            os.kill(target, signal.SIGKILL)
-        except ProcessLookupError:
-            pass
-        except PermissionError:
-            logger.error(f"Permission denied sending SIGKILL to PID {target}")
+        for target, pidfd in handles():
+            _signal_target(target, pidfd, signal.SIGKILL)
+    finally:
+        for pidfd in pidfds.values():
+            if pidfd is not None:
+                os.close(pidfd)
 
 
 FIRECRACKER_BIN = "/usr/bin/firecracker"
@@ -332,6 +412,9 @@ class MicroVM:
         self.console_conn = None  # Connection to console socket if not owner
         self.event_callbacks = {}  # cmd_id -> {stdout: func, stderr: func, exit: func}
         self.agent_ready = False
+        # Set alongside agent_ready so waiters wake on the ready event
+        # instead of at their next poll.
+        self._agent_ready_event = threading.Event()
         self.env_vars = {}
         self._uv_available = None  # Cache for uv availability check
 
@@ -550,10 +633,10 @@ class MicroVM:
 
     def _handle_stdout_line(self, line):
         """Parses a line from stdout (event)."""
-        import json
-
         try:
-            event = json.loads(line)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+            # handler below covers both parsers.
+            event = _json_loads(line)
             evt_type = event.get("type")
             payload = event.get("payload")
 
@@ -562,6 +645,7 @@ class MicroVM:
                 cmd_id = payload.get("cmd_id")
                 if status == "ready":
                     self.agent_ready = True
+                    self._agent_ready_event.set()
                     logger.info("Agent is ready")
                 elif status == "started":
                     pid = payload.get("pid")
@@ -31,6 +31,60 @@ from .protocol import (
 
 logger = logging.getLogger(__name__)
 
+def _sendmsg_all(sock: socket.socket, buffers) -> None:
+    """Like sendall() for several buffers, gathered into sendmsg() calls."""
+    views = [memoryview(b).cast("B") for b in buffers if len(b)]
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
+
+
+# Kernel socket buffers for accepted guest connections. Bulk transfers move
+# MBs per request; larger buffers mean fewer wakeups per MB.
+_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Receive buffer for raw upload payloads. Large enough that a multi-MB upload
+# needs only a handful of recv syscalls, and reused for the whole transfer so
+# no per-chunk bytes objects are allocated.
+_UPLOAD_RECV_SIZE = 1 << 20
+
+
+def _recv_payload(client: socket.socket, size: int, initial_data: bytes, sink, md5) -> int:
+    """Stream ``size`` raw bytes from ``client`` into ``sink``.
+
+    ``initial_data`` holds bytes already read past the request line. ``sink``
+    is called with memoryview slices of a reused buffer, so it must copy what
+    it keeps. Returns the number of bytes received, which is short of ``size``
+    only if the peer closed the connection early.
+    """
+    received = 0
+    if initial_data:
+        head = memoryview(initial_data)[:size]
+        sink(head)
+        if md5:
+            md5.update(head)
+        received = len(head)
+    if received >= size:
+        return received
+
+    buf = bytearray(min(_UPLOAD_RECV_SIZE, size - received))
+    view = memoryview(buf)
+    while received < size:
+        n = client.recv_into(view, min(len(buf), size - received), socket.MSG_WAITALL)
+        if not n:
+            break
+        chunk = view[:n]
+        sink(chunk)
+        if md5:
+            md5.update(chunk)
+        received += n
+    return received
+
 
 class VsockHostListener:
     """Listens for guest-initiated vsock connections.
@@ -273,6 +327,13 @@ class VsockHostListener:
                 # anything reasonable; the guest abandons faster on its
                 # end so a hang here is bounded regardless.
                 client_socket.settimeout(300)
+                for option in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+                    try:
+                        client_socket.setsockopt(
+                            socket.SOL_SOCKET, option, _SOCKET_BUFFER_SIZE
+                        )
+                    except OSError:
+                        pass
 
                 handler = threading.Thread(
                     target=self._handle_connection,
@@ -384,6 +445,29 @@ class VsockHostListener:
             except Exception:
                 pass
 
+    @staticmethod
+    def _upload_checksum(
+        client: socket.socket, request: UploadRequest, initial_data: bytes
+    ) -> str:
+        """Return the MD5 the upload must match ("" if unverified).
+
+        Trailing-checksum uploads follow the raw data with a
+        ``{"type": "checksum", "md5": ...}`` line, which is read here.
+        """
+        if not request.trailing_checksum:
+            return request.checksum
+
+        buffer = bytearray(initial_data[request.size :])
+        while b"\n" not in buffer:
+            chunk = client.recv(4096)
+            if not chunk:
+                raise ConnectionError("connection closed before checksum")
+            buffer += chunk
+        trailer = json.loads(buffer.split(b"\n", 1)[0])
+        if trailer.get("type") != "checksum" or not trailer.get("md5"):
+            raise ValueError(f"expected checksum message, got {trailer.get('type')!r}")
+        return trailer["md5"]
+
     def _handle_upload(
         self, client: socket.socket, request: UploadRequest, initial_data: bytes
     ):
@@ -392,7 +476,8 @@ class VsockHostListener:
         Protocol:
         1. Guest sends UploadRequest with path, size, checksum, cmd_id
         2. Host sends ReadyResponse
-        3. Guest sends raw binary data (size bytes)
+        3. Guest sends raw binary data (size bytes), followed by a checksum
+           line if the request set trailing_checksum
         4. Host verifies checksum and sends CompleteResponse or ErrorResponse
 
         The destination path is determined by:
@@ -429,29 +514,24 @@ class VsockHostListener:
                 client,
                 {"type": ResponseType.READY.value, "cmd_id": request.cmd_id},
             )
-            received = 0
-            md5 = hashlib.md5() if request.checksum else None
+            md5 = (
+                hashlib.md5()
+                if request.checksum or request.trailing_checksum
+                else None
+            )
             try:
-                if initial_data:
-                    data = initial_data[: request.size]
-                    buf_slot["buf"].extend(data)
-                    received += len(data)
-                    if md5:
-                        md5.update(data)
-                while received < request.size:
-                    chunk = client.recv(min(CHUNK_SIZE, request.size - received))
-                    if not chunk:
-                        buf_slot["error"] = "Connection closed during upload"
-                        buf_slot["done"].set()
-                        self._send_error(client, request.cmd_id, buf_slot["error"])
-                        return
-                    buf_slot["buf"].extend(chunk)
-                    received += len(chunk)
-                    if md5:
-                        md5.update(chunk)
-                if md5 and md5.hexdigest() != request.checksum:
+                received = _recv_payload(
+                    client, request.size, initial_data, buf_slot["buf"].extend, md5
+                )
+                if received < request.size:
+                    buf_slot["error"] = "Connection closed during upload"
+                    buf_slot["done"].set()
+                    self._send_error(client, request.cmd_id, buf_slot["error"])
+                    return
+                expected = self._upload_checksum(client, request, initial_data)
+                if md5 and md5.hexdigest() != expected:
                     buf_slot["error"] = (
-                        f"Checksum mismatch: expected {request.checksum}, got {md5.hexdigest()}"
+                        f"Checksum mismatch: expected {expected}, got {md5.hexdigest()}"
                     )
                     buf_slot["done"].set()
                     self._send_error(client, request.cmd_id, buf_slot["error"])
@@ -510,38 +590,33 @@ class VsockHostListener:
         if dest_path:
             dest = Path(dest_path)
             tmp_path = dest.with_name(f".{dest.name}.{request.cmd_id}.tmp")
-            received = 0
-            md5 = hashlib.md5() if request.checksum else None
+            md5 = (
+                hashlib.md5()
+                if request.checksum or request.trailing_checksum
+                else None
+            )
             try:
                 dest.parent.mkdir(parents=True, exist_ok=True)
                 with open(tmp_path, "wb") as f:
-                    if initial_data:
-                        data = initial_data[: request.size]
-                        f.write(data)
-                        received += len(data)
-                        if md5:
-                            md5.update(data)
-                    while received < request.size:
-                        chunk = client.recv(min(CHUNK_SIZE, request.size - received))
-                        if not chunk:
-                            self._send_error(
-                                client,
-                                request.cmd_id,
-                                "Connection closed during upload",
-                            )
-                            return
-                        f.write(chunk)
-                        received += len(chunk)
-                        if md5:
-                            md5.update(chunk)
+                    received = _recv_payload(
+                        client, request.size, initial_data, f.write, md5
+                    )
+                if received < request.size:
+                    self._send_error(
+                        client,
+                        request.cmd_id,
+                        "Connection closed during upload",
+                    )
+                    return
 
+                expected = self._upload_checksum(client, request, initial_data)
                 if md5:
                     file_hash = md5.hexdigest()
-                    if file_hash != request.checksum:
+                    if file_hash != expected:
                         self._send_error(
                             client,
                             request.cmd_id,
-                            f"Checksum mismatch: expected {request.checksum}, got {file_hash}",
+                            f"Checksum mismatch: expected {expected}, got {file_hash}",
                         )
                         return
 
@@ -580,44 +655,45 @@ class VsockHostListener:
                 f"Upload too large for in-memory path: {request.size} > {_LEGACY_MAX}",
             )
             return
-        received = len(initial_data)
-        md5 = hashlib.md5() if request.checksum else None
-        if md5:
-            md5.update(initial_data)
-        chunks = [initial_data] if initial_data else []
-
-        while received < request.size:
-            try:
-                chunk = client.recv(min(CHUNK_SIZE, request.size - received))
-                if not chunk:
-                    self._send_error(
-                        client, request.cmd_id, "Connection closed during upload"
-                    )
-                    return
-                chunks.append(chunk)
-                if md5:
-                    md5.update(chunk)
-                received += len(chunk)
-            except socket.timeout:
-                self._send_error(client, request.cmd_id, "Upload timed out")
+        md5 = (
+            hashlib.md5()
+            if request.checksum or request.trailing_checksum
+            else None
+        )
+        payload = bytearray()
+        try:
+            received = _recv_payload(
+                client, request.size, initial_data, payload.extend, md5
+            )
+            if received < request.size:
+                self._send_error(
+                    client, request.cmd_id, "Connection closed during upload"
+                )
                 return
+            expected = self._upload_checksum(client, request, initial_data)
+        except socket.timeout:
+            self._send_error(client, request.cmd_id, "Upload timed out")
+            return
+        except (ConnectionError, ValueError) as e:
+            self._send_error(client, request.cmd_id, f"Bad checksum trailer: {e}")
+            return
 
         if md5:
             file_hash = md5.hexdigest()
-            if file_hash != request.checksum:
+            if file_hash != expected:
                 self._send_error(
                     client,
                     request.cmd_id,
-                    f"Checksum mismatch: expected {request.checksum}, got {file_hash}",
+                    f"Checksum mismatch: expected {expected}, got {file_hash}",
                 )
                 return
 
-        data = b"".join(chunks)
+        data = bytes(payload)
 
         try:
             if self.on_upload:
                 # Use callback
-                success = self.on_upload(request.path, data, request.checksum)
+                success = self.on_upload(request.path, data, expected)
                 if not success:
                     self._send_error(client, request.cmd_id, "Upload callback failed")
                     return
@@ -785,18 +861,18 @@ class VsockHostListener:
         check between two memory regions on the same machine is pure
         overhead. Empty checksum tells the agent to skip verification.
         """
-        self._send_message(
-            client,
+        header = encode_message(
             {
                 "type": ResponseType.READY.value,
                 "cmd_id": request.cmd_id,
                 "size": len(data),
                 "checksum": "",
-            },
+            }
         )
-        # sendall releases the GIL inside the kernel write — concurrent
-        # downloads can actually run in parallel here.
-        client.sendall(data)
+        # Header and payload go out together via sendmsg, so the payload is
+        # never copied into a combined buffer. The kernel write releases the
+        # GIL — concurrent downloads can actually run in parallel here.
+        _sendmsg_all(client, (header, data))
         logger.debug(
             f"Vsock raw download served: {request.path} ({len(data)} bytes)"
         )
@@ -51,21 +51,29 @@ class UploadRequest:
 
     The guest has a file it wants to send to the host.
     After host responds with READY, guest sends raw binary data.
+
+    With ``trailing_checksum`` set, the guest hashes while it streams and
+    follows the raw data with a ``{"type": "checksum", "md5": ...}`` line
+    instead of sending ``checksum`` up front.
     """
 
     path: str  # Destination path on host
     size: int  # File size in bytes
     checksum: str  # Optional MD5 checksum for verification
     cmd_id: str  # Command ID for correlation
+    trailing_checksum: bool = False  # MD5 follows the raw data
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        result = {
             "type": RequestType.UPLOAD.value,
             "path": self.path,
             "size": self.size,
             "checksum": self.checksum,
             "cmd_id": self.cmd_id,
         }
+        if self.trailing_checksum:
+            result["trailing_checksum"] = True
+        return result
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "UploadRequest":
@@ -74,6 +82,7 @@ class UploadRequest:
             size=data["size"],
             checksum=data.get("checksum", ""),
             cmd_id=data["cmd_id"],
+            trailing_checksum=bool(data.get("trailing_checksum", False)),
         )
 
 
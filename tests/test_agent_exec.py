@@ -0,0 +1,229 @@
+"""Tests for exec output handling in the guest agent."""
+
+import importlib.util
+import io
+import json
+import threading
+from pathlib import Path
+
+
+def _load_agent_module():
+    path = Path(__file__).resolve().parents[1] / "bandsox" / "agent.py"
+    spec = importlib.util.spec_from_file_location("bandsox_agent_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+agent = _load_agent_module()
+
+
+def _events(buf):
+    return [json.loads(line) for line in buf.getvalue().splitlines() if line]
+
+
+def _output(events, cmd_id, stream):
+    return "".join(
+        e["payload"]["data"]
+        for e in events
+        if e["type"] == "output"
+        and e["payload"]["cmd_id"] == cmd_id
+        and e["payload"]["stream"] == stream
+    )
+
+
+def test_foreground_exec_emits_all_output_before_exit(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+
+    agent.handle_command(
+        "fg-1", "printf 'one\\ntwo\\npartial'; echo oops >&2; exit 3"
+    )
+
+    events = _events(buf)
+    assert _output(events, "fg-1", "stdout") == "one\ntwo\npartial"
+    assert _output(events, "fg-1", "stderr") == "oops\n"
+    assert events[-1] == {"type": "exit", "payload": {"cmd_id": "fg-1", "exit_code": 3}}
+
+
+def test_concurrent_commands_share_the_reactor(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+
+    threads = [
+        threading.Thread(
+            target=agent.handle_command, args=(f"cc-{i}", f"seq 1 {50 + i}")
+        )
+        for i in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    events = _events(buf)
+    for i in range(6):
+        expected = "".join(f"{n}\n" for n in range(1, 51 + i))
+        assert _output(events, f"cc-{i}", "stdout") == expected
+    assert sum(1 for e in events if e["type"] == "exit") == 6
+
+
+def test_background_exec_reports_started_then_exit(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    done = threading.Event()
+    real_send = agent.send_event
+
+    def send_event(etype, payload):
+        real_send(etype, payload)
+        if etype == "exit":
+            done.set()
+
+    monkeypatch.setattr(agent, "send_event", send_event)
+
+    agent.handle_command("bg-1", "echo hello", background=True)
+    assert done.wait(timeout=10)
+
+    events = _events(buf)
+    assert events[0]["payload"]["status"] == "started"
+    assert _output(events, "bg-1", "stdout") == "hello\n"
+    assert events[-1]["payload"] == {"cmd_id": "bg-1", "exit_code": 0}
+    assert "bg-1" not in agent.sessions
+
+
+def test_dispatch_routes_by_type_and_rejects_unknown(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    calls = []
+    monkeypatch.setitem(
+        agent.REQUEST_HANDLERS,
+        "kill",
+        (lambda req: calls.append(req["id"]), agent._INLINE),
+    )
+
+    agent.dispatch_request({"type": "kill", "id": "k-1"})
+    agent.dispatch_request({"type": "bogus", "id": "b-1"})
+
+    assert calls == ["k-1"]
+    events = _events(buf)
+    assert events == [
+        {
+            "type": "error",
+            "payload": {"cmd_id": "b-1", "error": "Unknown request type: bogus"},
+        }
+    ]
+
+
+def test_file_requests_run_on_the_bounded_pool(monkeypatch):
+    seen = []
+    done = threading.Event()
+
+    def handler(req):
+        seen.append(threading.current_thread().name)
+        done.set()
+
+    monkeypatch.setitem(agent.REQUEST_HANDLERS, "list_dir", (handler, agent._POOL))
+
+    agent.dispatch_request({"type": "list_dir", "id": "ld-1"})
+
+    assert done.wait(timeout=5)
+    assert seen[0].startswith("agent-worker")
+
+
+def test_main_splits_pipelined_requests_and_skips_noise(monkeypatch):
+    import os
+
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    seen = []
+    monkeypatch.setattr(agent, "dispatch_request", seen.append)
+
+    r_fd, w_fd = os.pipe()
+    os.write(
+        w_fd,
+        b'{"type": "kill", "id": "a"}\n'
+        b"kernel: some console noise\n"
+        b'42\r\n{"type": "kill", "id": "b"}\r\n{"type": "kill", '
+        b'"id": "c"}\n{"type": "kill", "id": "no-newline"}',
+    )
+    os.close(w_fd)
+    with os.fdopen(r_fd, "r") as stdin:
+        monkeypatch.setattr(agent.sys, "stdin", stdin)
+        agent.main()
+
+    assert [req["id"] for req in seen] == ["a", "b", "c"]
+    assert _events(buf)[0]["payload"] == {"status": "ready"}
+
+
+def test_main_survives_lines_that_are_not_utf8(monkeypatch):
+    import os
+
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    seen = []
+    monkeypatch.setattr(agent, "dispatch_request", seen.append)
+
+    r_fd, w_fd = os.pipe()
+    os.write(
+        w_fd,
+        b'{"type": "kill", "id": "\xff\xfe"}\n'
+        b'{"type": "kill", "id": "after"}\n',
+    )
+    os.close(w_fd)
+    with os.fdopen(r_fd, "r") as stdin:
+        monkeypatch.setattr(agent.sys, "stdin", stdin)
+        agent.main()
+
+    assert [req["id"] for req in seen] == ["after"]
+
+
+def test_pop_session_hands_out_master_fd_once():
+    agent.register_session("pty-1", 12345, master_fd=99)
+
+    assert agent.get_session("pty-1") == (12345, 99)
+    assert agent.pop_session("pty-1") == 99
+    assert agent.pop_session("pty-1") is None
+    assert agent.get_session("pty-1") is None
+
+
+def test_input_to_background_session_reaches_stdin(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    done = threading.Event()
+    real_send = agent.send_event
+
+    def send_event(etype, payload):
+        real_send(etype, payload)
+        if etype == "exit":
+            done.set()
+
+    monkeypatch.setattr(agent, "send_event", send_event)
+
+    agent.handle_command("in-1", "head -n 1", background=True)
+    agent.handle_input("in-1", "ping\n")
+    assert done.wait(timeout=10)
+
+    assert _output(_events(buf), "in-1", "stdout") == "ping\n"
+
+
+def test_output_is_forwarded_per_read_without_waiting_for_newline(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    eof = threading.Event()
+    stream = agent._OutputStream("chunk-1", "stdout", io.BytesIO(), eof.set)
+
+    snowman = "☃".encode()
+    stream(b"prompt> " + snowman[:1])
+    stream(snowman[1:] + b"\nmore")
+    stream(b"")
+
+    assert [e["payload"]["data"] for e in _events(buf)] == ["prompt> ", "☃\nmore"]
+    assert eof.is_set()
+
+
+def test_small_writes_run_inline_and_large_ones_on_the_pool():
+    small = {"type": "write_file", "content": "eA==" * 10}
+    large = {"type": "write_file", "content": "eA==" * (agent._INLINE_WRITE_MAX // 4 + 1)}
+
+    assert agent._write_file_mode(small) == agent._INLINE
+    assert agent._write_file_mode(large) == agent._POOL
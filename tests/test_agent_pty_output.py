@@ -0,0 +1,85 @@
+"""Tests for how the guest agent batches PTY output into events."""
+
+import base64
+import importlib.util
+import io
+import json
+import os
+from pathlib import Path
+
+
+def _load_agent_module():
+    path = Path(__file__).resolve().parents[1] / "bandsox" / "agent.py"
+    spec = importlib.util.spec_from_file_location("bandsox_agent_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+agent = _load_agent_module()
+
+
+class _Console:
+    """Collects the events the agent writes to its (swapped) stdout."""
+
+    def __init__(self, monkeypatch):
+        self.buf = io.StringIO()
+        monkeypatch.setattr(agent.sys, "stdout", self.buf)
+
+    def __iter__(self):
+        for line in self.buf.getvalue().splitlines():
+            event = json.loads(line)
+            yield event["type"], event["payload"]
+
+
+def test_buffered_output_is_coalesced_into_one_event(monkeypatch):
+    console = _Console(monkeypatch)
+    r_fd, w_fd = os.pipe()
+    try:
+        for i in range(5):
+            os.write(w_fd, f"line {i}\n".encode())
+        os.close(w_fd)
+        agent.read_pty_master(r_fd, "cmd-1")
+    finally:
+        os.close(r_fd)
+
+    events = list(console)
+    assert [etype for etype, _ in events] == ["output"]
+    payload = events[0][1]
+    assert payload["cmd_id"] == "cmd-1"
+    assert payload["stream"] == "stdout"
+    assert payload["encoding"] == "base64"
+    assert base64.b64decode(payload["data"]) == b"".join(
+        f"line {i}\n".encode() for i in range(5)
+    )
+
+
+def test_coalescing_is_capped_per_event(monkeypatch):
+    console = _Console(monkeypatch)
+    monkeypatch.setattr(agent, "_PTY_READ_SIZE", 4)
+    monkeypatch.setattr(agent, "_PTY_COALESCE_MAX_READS", 2)
+    r_fd, w_fd = os.pipe()
+    try:
+        os.write(w_fd, b"abcdefghijkl")
+        os.close(w_fd)
+        agent.read_pty_master(r_fd, "cmd-2")
+    finally:
+        os.close(r_fd)
+
+    chunks = [base64.b64decode(p["data"]) for _, p in console]
+    assert chunks == [b"abcdefgh", b"ijkl"]
+
+
+def test_output_template_escapes_cmd_id():
+    prefix, suffix = agent._output_event_template('we"ird\\id', "stdout", "base64")
+    event = json.loads(prefix + b"aGk=" + suffix)
+
+    assert event == {
+        "type": "output",
+        "payload": {
+            "cmd_id": 'we"ird\\id',
+            "stream": "stdout",
+            "encoding": "base64",
+            "data": "aGk=",
+        },
+    }
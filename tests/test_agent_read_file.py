@@ -0,0 +1,77 @@
+"""Tests for the guest agent's serial read_file path."""
+
+import base64
+import hashlib
+import importlib.util
+import io
+import json
+from pathlib import Path
+
+
+def _load_agent_module():
+    path = Path(__file__).resolve().parents[1] / "bandsox" / "agent.py"
+    spec = importlib.util.spec_from_file_location("bandsox_agent_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+agent = _load_agent_module()
+
+
+def _read_events(monkeypatch, path):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+    agent.handle_read_file("rf-cmd", str(path))
+    return [json.loads(line) for line in buf.getvalue().splitlines() if line]
+
+
+def test_large_file_is_sent_in_checksummed_chunks(tmp_path, monkeypatch):
+    payload = bytes(range(256)) * 200  # 50 KiB, above the inline limit
+    source = tmp_path / "big.bin"
+    source.write_bytes(payload)
+
+    events = _read_events(monkeypatch, source)
+
+    chunks = [e["payload"] for e in events if e["type"] == "file_chunk"]
+    assert len(chunks) > 1
+    assert [c["offset"] for c in chunks] == sorted(c["offset"] for c in chunks)
+    data = b"".join(base64.b64decode(c["data"]) for c in chunks)
+    assert data == payload
+
+    complete = next(e["payload"] for e in events if e["type"] == "file_complete")
+    assert complete["total_size"] == len(payload)
+    assert complete["checksum"] == hashlib.md5(payload).hexdigest()
+    assert events[-1] == {
+        "type": "exit",
+        "payload": {"cmd_id": "rf-cmd", "exit_code": 0},
+    }
+
+
+def test_small_file_is_sent_inline(tmp_path, monkeypatch):
+    source = tmp_path / "small.txt"
+    source.write_bytes(b"hello")
+
+    events = _read_events(monkeypatch, source)
+
+    assert events[0]["type"] == "file_content"
+    assert base64.b64decode(events[0]["payload"]["content"]) == b"hello"
+    assert events[-1]["payload"]["exit_code"] == 0
+
+
+def test_missing_file_reports_error(tmp_path, monkeypatch):
+    events = _read_events(monkeypatch, tmp_path / "nope")
+
+    assert events[0]["type"] == "error"
+    assert events[-1]["payload"]["exit_code"] == 1
+
+
+def test_chunk_events_escape_awkward_paths(tmp_path, monkeypatch):
+    source = tmp_path / 'we"ird \\ näme.bin'
+    source.write_bytes(b"z" * (40 * 1024))
+
+    events = _read_events(monkeypatch, source)
+
+    chunks = [e["payload"] for e in events if e["type"] == "file_chunk"]
+    assert chunks and all(c["path"] == str(source) for c in chunks)
+    assert sum(c["size"] for c in chunks) == 40 * 1024
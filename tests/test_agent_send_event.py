@@ -106,3 +106,17 @@ def test_concurrent_send_event_produces_valid_json_lines(tmp_path):
             raise AssertionError(f"line {i} is not valid JSON: {line!r}") from e
         assert obj.get("type") == "output"
         assert "payload" in obj
+
+
+def test_exit_event_fast_path_matches_generic_encoding(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(agent.sys, "stdout", buf)
+
+    agent.send_event("exit", {"cmd_id": 'we"ird\\id', "exit_code": -9})
+    agent.send_event("exit", {"cmd_id": "c2", "exit_code": 0, "extra": True})
+
+    events = [json.loads(line) for line in buf.getvalue().splitlines()]
+    assert events == [
+        {"type": "exit", "payload": {"cmd_id": 'we"ird\\id', "exit_code": -9}},
+        {"type": "exit", "payload": {"cmd_id": "c2", "exit_code": 0, "extra": True}},
+    ]
@@ -0,0 +1,239 @@
+"""Tests for VM and snapshot metadata in local storage."""
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox.core import BandSox
+
+
+def _write_vm(bs, vm_id, **extra):
+    meta = {"id": vm_id, "status": "running", **extra}
+    with open(bs.metadata_dir / f"{vm_id}.json", "w") as f:
+        json.dump(meta, f)
+
+
+def test_list_vms_marks_vms_without_socket_stopped(tmp_path):
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-live", created_at=2)
+    _write_vm(bs, "vm-dead", created_at=1)
+    (bs.sockets_dir / "vm-live.sock").touch()
+
+    vms = bs.list_vms()
+
+    assert [vm["id"] for vm in vms] == ["vm-live", "vm-dead"]
+    assert vms[0]["status"] == "running"
+    assert vms[1]["status"] == "stopped"
+
+
+def test_list_vms_filters_and_limits(tmp_path):
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a", created_at=1, metadata={"team": "x"})
+    _write_vm(bs, "vm-b", created_at=2, metadata={"team": "y"})
+    _write_vm(bs, "vm-c", created_at=3, metadata={"team": "x"})
+
+    vms = bs.list_vms(metadata_equals={"team": "x"})
+    assert [vm["id"] for vm in vms] == ["vm-c", "vm-a"]
+
+    assert [vm["id"] for vm in bs.list_vms(limit=1)] == ["vm-c"]
+
+
+def test_list_snapshots_reports_missing_and_corrupt_metadata(tmp_path):
+    bs = BandSox(storage_dir=str(tmp_path))
+    good = bs.snapshots_dir / "snap-good"
+    good.mkdir()
+    (good / "metadata.json").write_text(json.dumps({"snapshot_name": "good"}))
+    (bs.snapshots_dir / "snap-empty").mkdir()
+    bad = bs.snapshots_dir / "snap-bad"
+    bad.mkdir()
+    (bad / "metadata.json").write_text("{not json")
+    (bs.snapshots_dir / "stray-file").write_text("ignored")
+
+    listed = bs.list_snapshots()
+    snaps = {s["path"].rsplit("/", 1)[-1]: s for s in listed}
+
+    assert list(snaps) == ["snap-bad", "snap-empty", "snap-good"]
+    assert snaps["snap-good"]["id"] == "good"
+    assert snaps["snap-empty"]["status"] == "no_metadata"
+    assert snaps["snap-bad"]["status"] == "metadata_corrupted"
+
+
+def test_save_metadata_replaces_file_without_leftovers(tmp_path):
+    bs = BandSox(storage_dir=str(tmp_path))
+    bs._save_metadata("vm-x", {"id": "vm-x", "status": "running"})
+    bs._save_metadata("vm-x", {"id": "vm-x", "status": "stopped"})
+
+    assert bs._get_metadata("vm-x")["status"] == "stopped"
+    assert sorted(p.name for p in bs.metadata_dir.iterdir()) == ["vm-x.json"]
+    assert bs._get_metadata("missing") == {}
+
+
+def test_list_vms_reuses_parsed_metadata_until_it_changes(tmp_path, monkeypatch):
+    import bandsox.core as core
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a", created_at=1, metadata={})
+    _write_vm(bs, "vm-b", created_at=2, metadata={})
+    reads = []
+    real_read = core._read_small_file
+    monkeypatch.setattr(
+        core, "_read_small_file", lambda p: reads.append(p) or real_read(p)
+    )
+
+    first = bs.list_vms()[0]
+    first["status"] = "mutated by caller"
+    first["metadata"]["nested"] = "mutated by caller"
+    again = bs.list_vms()[0]
+    assert again["status"] == "stopped"
+    assert "nested" not in again["metadata"]
+    assert len(reads) == 2
+
+    bs._save_metadata("vm-a", {"id": "vm-a", "created_at": 3, "status": "stopped"})
+    (bs.metadata_dir / "vm-b.json").unlink()
+    vms = bs.list_vms()
+
+    assert [vm["id"] for vm in vms] == ["vm-a"]
+    assert vms[0]["created_at"] == 3
+    assert len(reads) == 3
+    assert list(bs._vm_meta_cache) == [str(bs.metadata_dir / "vm-a.json")]
+
+
+def test_update_vm_status_skips_unchanged_status(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a")
+    saves = []
+    real_save = bs._save_metadata
+
+    def save(vm_id, meta):
+        saves.append(meta["status"])
+        real_save(vm_id, meta)
+
+    monkeypatch.setattr(bs, "_save_metadata", save)
+
+    bs.update_vm_status("vm-a", "paused")
+    bs.update_vm_status("vm-a", "paused")
+    bs.update_vm_status("vm-a", "running")
+
+    assert saves == ["paused", "running"]
+    assert bs._get_metadata("vm-a")["status"] == "running"
+
+
+def test_delete_vm_removes_whatever_files_exist(tmp_path):
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a")
+    (bs.images_dir / "vm-a.ext4").write_bytes(b"rootfs")
+
+    bs.delete_vm("vm-a")
+    bs.delete_vm("vm-a")
+
+    assert not (bs.metadata_dir / "vm-a.json").exists()
+    assert not (bs.images_dir / "vm-a.ext4").exists()
+    assert bs.list_vms() == []
+
+
+def test_ready_event_marks_agent_ready_in_compact_or_spaced_json(tmp_path):
+    from bandsox.core import ManagedMicroVM
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    for vm_id, line in [
+        ("vm-a", '{"type":"status","payload":{"status":"ready"}}'),
+        ("vm-b", '{"type": "status", "payload": {"status": "ready"}}'),
+    ]:
+        _write_vm(bs, vm_id)
+        vm = ManagedMicroVM(vm_id, str(tmp_path / f"{vm_id}.sock"), bs)
+        vm._handle_stdout_line('{"type":"output","payload":{"data":"ready"}}')
+        assert not bs._get_metadata(vm_id).get("agent_ready")
+
+        vm._handle_stdout_line(line)
+        assert bs._get_metadata(vm_id)["agent_ready"] is True
+
+
+def test_get_metadata_rereads_only_changed_files(tmp_path, monkeypatch):
+    import bandsox.core as core
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a", network_config={"tap_name": "tap0"})
+    opens = []
+    real_open = core.os.open
+
+    def counting_open(path, *args, **kwargs):
+        opens.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(core.os, "open", counting_open)
+
+    first = bs._get_metadata("vm-a")
+    first["network_config"]["tap_name"] = "mutated"
+    assert bs._get_metadata("vm-a")["network_config"]["tap_name"] == "tap0"
+    assert len(opens) == 1
+
+    _write_vm(bs, "vm-a", status="paused")
+    assert bs._get_metadata("vm-a")["status"] == "paused"
+    assert len(opens) == 2
+
+    (bs.metadata_dir / "vm-a.json").unlink()
+    assert bs._get_metadata("vm-a") == {}
+
+
+def test_ready_is_persisted_once_then_skipped(tmp_path, monkeypatch):
+    from bandsox.core import ManagedMicroVM
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a")
+    vm = ManagedMicroVM("vm-a", str(tmp_path / "vm-a.sock"), bs)
+    ready = '{"type":"status","payload":{"status":"ready"}}'
+    vm._handle_stdout_line(ready)
+
+    reads = []
+    monkeypatch.setattr(bs, "_get_metadata", lambda vm_id: reads.append(vm_id) or {})
+    vm._handle_stdout_line(ready)
+    vm._handle_stdout_line('{"type":"output","payload":{"data":"ready"}}')
+
+    assert reads == []
+
+
+def test_wait_for_agent_wakes_on_ready_event(tmp_path):
+    import threading
+    import time
+
+    from bandsox.core import ManagedMicroVM
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a")
+    vm = ManagedMicroVM("vm-a", str(tmp_path / "vm-a.sock"), bs)
+    vm.console_conn = object()  # pretend the console is attached
+    ready = '{"type":"status","payload":{"status":"ready"}}'
+    threading.Timer(0.05, vm._handle_stdout_line, args=(ready,)).start()
+
+    start = time.monotonic()
+    assert vm.wait_for_agent(timeout=5)
+    assert time.monotonic() - start < 0.4
+
+
+def test_stop_reads_and_writes_metadata_once(tmp_path, monkeypatch):
+    from bandsox.core import ManagedMicroVM
+
+    bs = BandSox(storage_dir=str(tmp_path))
+    _write_vm(bs, "vm-a", agent_ready=True)
+    vm = ManagedMicroVM("vm-a", str(tmp_path / "vm-a.sock"), bs)
+    calls = []
+    real_get, real_save = bs._get_metadata, bs._save_metadata
+    monkeypatch.setattr(
+        bs, "_get_metadata", lambda vm_id: calls.append("get") or real_get(vm_id)
+    )
+    monkeypatch.setattr(
+        bs,
+        "_save_metadata",
+        lambda vm_id, meta, **kw: calls.append("save") or real_save(vm_id, meta, **kw),
+    )
+
+    vm.stop()
+
+    assert calls == ["get", "save"]
+    meta = real_get("vm-a")
+    assert meta["status"] == "stopped"
+    assert meta["agent_ready"] is False
@@ -0,0 +1,214 @@
+"""Tests for cloning per-VM rootfs images."""
+
+import errno
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import bandsox.core as core
+from bandsox.core import BandSox
+
+
+def test_clone_rootfs_copies_when_reflink_is_unsupported(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    src = tmp_path / "base.ext4"
+    src.write_bytes(b"rootfs" * 1000)
+    dest = tmp_path / "vm.ext4"
+    dest.write_bytes(b"stale")
+
+    def no_reflink(fd, request, arg):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(core.fcntl, "ioctl", no_reflink)
+
+    assert bs._clone_rootfs(src, dest) == "copy"
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_unsupported_reflink_is_not_retried(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    src = tmp_path / "base.ext4"
+    src.write_bytes(b"rootfs")
+    calls = []
+
+    def no_reflink(fd, request, arg):
+        calls.append(request)
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(core.fcntl, "ioctl", no_reflink)
+
+    assert bs._clone_rootfs(src, tmp_path / "a.ext4") == "copy"
+    assert bs._clone_rootfs(src, tmp_path / "b.ext4") == "copy"
+    assert len(calls) == 1
+    assert (tmp_path / "b.ext4").read_bytes() == b"rootfs"
+
+
+def test_clone_rootfs_uses_ficlone(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    src = tmp_path / "base.ext4"
+    src.write_bytes(b"rootfs")
+    calls = []
+    monkeypatch.setattr(
+        core.fcntl, "ioctl", lambda fd, request, arg: calls.append(request)
+    )
+
+    assert bs._clone_rootfs(src, tmp_path / "vm.ext4") == "reflink"
+    assert calls == [core._FICLONE]
+
+
+class _StopAfterClone(Exception):
+    pass
+
+
+def test_create_vm_builds_missing_base_image_once(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    kernel = tmp_path / "vmlinux"
+    kernel.write_bytes(b"")
+    builds = []
+
+    def build_rootfs(image, output_path):
+        builds.append(image)
+        Path(output_path).write_bytes(b"rootfs")
+
+    real_clone = bs._clone_rootfs
+
+    def clone_then_stop(src, dest):
+        real_clone(src, dest)
+        raise _StopAfterClone(Path(src).name)
+
+    monkeypatch.setattr(core, "build_rootfs", build_rootfs)
+    monkeypatch.setattr(bs, "_clone_rootfs", clone_then_stop)
+    monkeypatch.setattr(core.ManagedMicroVM, "start_process", lambda self: None)
+
+    for _ in range(2):
+        try:
+            bs.create_vm("library/alpine:3.19", kernel_path=str(kernel))
+        except _StopAfterClone as stop:
+            assert str(stop) == "library_alpine_3.19.ext4"
+
+    assert builds == ["library/alpine:3.19"]
+
+
+def test_copy_fallback_keeps_images_sparse(tmp_path, monkeypatch):
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    bs._reflink_supported = False
+    src = tmp_path / "base.ext4"
+    with open(src, "wb") as f:
+        f.write(b"superblock")
+        f.seek(64 * 1024 * 1024)
+        f.write(b"tail")
+    dest = tmp_path / "vm.ext4"
+
+    assert bs._clone_rootfs(src, dest) == "copy"
+
+    assert dest.stat().st_size == src.stat().st_size
+    with open(dest, "rb") as f:
+        assert f.read(10) == b"superblock"
+        f.seek(64 * 1024 * 1024)
+        assert f.read() == b"tail"
+    # Holes were skipped rather than written out as zeros.
+    assert dest.stat().st_blocks <= src.stat().st_blocks + 64
+
+
+def test_untagged_dockerfile_builds_share_a_content_tag(tmp_path, monkeypatch):
+    import docker
+
+    import bandsox.image as image
+
+    dockerfile = tmp_path / "Dockerfile"
+    dockerfile.write_text("FROM alpine\n")
+    tags = []
+
+    class FakeImage:
+        id = "sha256:" + "ab" * 32
+
+        def tag(self, repository, tag):
+            tags.append(f"{repository}:{tag}")
+
+    class FakeClient:
+        class images:
+            @staticmethod
+            def build(**kwargs):
+                assert kwargs["tag"] is None
+                return FakeImage(), []
+
+    monkeypatch.setattr(docker, "from_env", FakeClient)
+
+    first = image.build_image_from_dockerfile(str(dockerfile))
+    second = image.build_image_from_dockerfile(str(dockerfile))
+
+    assert first == second == "bandsox-build:" + "ab" * 8
+    assert tags == [first, second]
+    assert core._base_rootfs_name(first) == core._base_rootfs_name(second)
+
+
+def _recording_create_vm(tmp_path, monkeypatch, base_exists, prepare_raises=False):
+    """Run create_vm with Firecracker and the rootfs steps stubbed out and
+    return the order in which they ran."""
+    import threading
+
+    bs = BandSox(storage_dir=str(tmp_path / "storage"))
+    kernel = tmp_path / "vmlinux"
+    kernel.write_bytes(b"")
+    if base_exists:
+        (bs.images_dir / "library_alpine_3.19.ext4").write_bytes(b"rootfs")
+    rootfs_ready = threading.Event()
+    events = []
+
+    def build_rootfs(image, output_path):
+        events.append("built")
+        Path(output_path).write_bytes(b"rootfs")
+
+    def start_process(vm):
+        events.append("started")
+        # Wait (briefly) for the rootfs work, so an overlap is observable.
+        if rootfs_ready.wait(timeout=0.5):
+            events.append("overlapped")
+
+    def prepare(base_rootfs, instance_rootfs, disk_size_mib):
+        events.append("prepared")
+        rootfs_ready.set()
+        raise _StopAfterClone()
+
+    monkeypatch.setattr(core, "build_rootfs", build_rootfs)
+    monkeypatch.setattr(core.ManagedMicroVM, "start_process", start_process)
+    monkeypatch.setattr(bs, "_prepare_instance_rootfs", prepare)
+    monkeypatch.setattr(core.MicroVM, "stop", lambda vm: events.append("stopped"))
+    return bs, kernel, events
+
+
+def test_firecracker_starts_while_rootfs_is_prepared(tmp_path, monkeypatch):
+    bs, kernel, events = _recording_create_vm(tmp_path, monkeypatch, base_exists=True)
+
+    with pytest.raises(_StopAfterClone):
+        bs.create_vm("library/alpine:3.19", kernel_path=str(kernel), parallel=True)
+
+    # The spawned process is stopped when preparing the rootfs fails.
+    assert "built" not in events
+    assert events[-1] == "stopped"
+    assert "overlapped" in events
+
+
+def test_parallel_create_builds_a_missing_base_before_starting(tmp_path, monkeypatch):
+    bs, kernel, events = _recording_create_vm(tmp_path, monkeypatch, base_exists=False)
+
+    with pytest.raises(_StopAfterClone):
+        bs.create_vm("library/alpine:3.19", kernel_path=str(kernel), parallel=True)
+
+    assert events[0] == "built"
+    assert events[-1] == "stopped"
+
+
+def test_create_vm_keeps_the_serial_order_by_default(tmp_path, monkeypatch):
+    bs, kernel, events = _recording_create_vm(tmp_path, monkeypatch, base_exists=True)
+
+    with pytest.raises(_StopAfterClone):
+        bs.create_vm("library/alpine:3.19", kernel_path=str(kernel))
+
+    # Preparing the rootfs failed before Firecracker was ever spawned.
+    assert events == ["prepared"]
@@ -0,0 +1,39 @@
+"""Tests for the Firecracker API payloads built by FirecrackerClient."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox.firecracker import FirecrackerClient
+
+
+def _capture(monkeypatch, client):
+    calls = []
+    monkeypatch.setattr(
+        client,
+        "_request",
+        lambda method, endpoint, data=None, log_error=True: calls.append(
+            (method, endpoint, data)
+        ),
+    )
+    return calls
+
+
+def test_load_snapshot_uses_file_memory_backend(monkeypatch):
+    client = FirecrackerClient("/tmp/fc.sock")
+    calls = _capture(monkeypatch, client)
+
+    client.load_snapshot("/snap/snapshot_file", "/snap/mem_file")
+
+    method, endpoint, data = calls[0]
+    assert (method, endpoint) == ("PUT", "/snapshot/load")
+    assert data["mem_backend"] == {
+        "backend_type": "File",
+        "backend_path": "/snap/mem_file",
+    }
+    assert "mem_file_path" not in data
+    assert data["resume_vm"] is False
+
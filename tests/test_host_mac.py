@@ -74,7 +74,9 @@ def test_setup_tap_device_pins_mac():
 
     with mock.patch.object(network, "run_command", side_effect=fake_run_command), \
          mock.patch.object(network.subprocess, "run", return_value=fake_completed), \
-         mock.patch.object(network, "_send_gratuitous_arp"):
+         mock.patch.object(network, "_send_gratuitous_arp"), \
+         mock.patch.object(network, "_enable_ip_forward"), \
+         mock.patch.object(network, "_netlink_usable", return_value=False):
         network.setup_tap_device("tapTEST", "172.16.78.1")
 
     set_addr_calls = [
@@ -0,0 +1,44 @@
+"""Tests for tearing down Firecracker process trees on stop."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox.vm import kill_process_tree
+
+
+def test_returns_as_soon_as_an_unreaped_child_exits():
+    # Popen children stay zombies until wait(); kill -0 still sees them, so
+    # only a pidfd notices they are gone before the timeout.
+    proc = subprocess.Popen(["sleep", "30"])
+    try:
+        start = time.monotonic()
+        kill_process_tree(proc.pid, timeout=5)
+        assert time.monotonic() - start < 1
+    finally:
+        proc.kill()
+        proc.wait()
+    assert proc.returncode == -15
+
+
+def test_escalates_to_sigkill_after_timeout():
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "import signal, time\n"
+         "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+         "print('ready', flush=True)\n"
+         "time.sleep(30)\n"],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        proc.stdout.readline()
+        kill_process_tree(proc.pid, timeout=0.2)
+        assert proc.wait(timeout=5) == -9
+    finally:
+        proc.kill()
+        proc.wait()
+        proc.stdout.close()
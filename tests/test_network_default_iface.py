@@ -0,0 +1,48 @@
+"""Tests for default-route interface discovery in bandsox.network."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox import network  # noqa: E402
+
+_ROUTES = (
+    "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+    "wlan0\t00000000\t0102A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0\n"
+    "eth1\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+    "docker0\t000011AC\t00000000\t0001\t0\t0\t0\t0000FFFF\t0\t0\t0\n"
+)
+
+
+def test_lowest_metric_default_route_wins_and_is_cached(tmp_path, monkeypatch):
+    routes = tmp_path / "route"
+    routes.write_text(_ROUTES)
+    monkeypatch.setattr(network, "_PROC_NET_ROUTE", str(routes))
+    monkeypatch.setattr(network, "_default_iface_cache", (None, 0.0))
+    monkeypatch.setattr(
+        network.subprocess,
+        "run",
+        lambda *a, **kw: (_ for _ in ()).throw(AssertionError("ip was run")),
+    )
+
+    assert network.get_default_interface() == "eth1"
+
+    routes.write_text(_ROUTES.replace("\t100\t", "\t900\t"))
+    assert network.get_default_interface() == "eth1"  # still cached
+
+    network.invalidate_default_interface()
+    assert network.get_default_interface() == "wlan0"
+
+
+def test_falls_back_to_ip_route_without_proc(tmp_path, monkeypatch):
+    from unittest import mock
+
+    monkeypatch.setattr(network, "_PROC_NET_ROUTE", str(tmp_path / "missing"))
+    monkeypatch.setattr(network, "_default_iface_cache", (None, 0.0))
+    out = mock.MagicMock(stdout=b"default via 10.0.0.1 dev enp3s0 proto dhcp metric 100\n")
+    monkeypatch.setattr(network.subprocess, "run", lambda *a, **kw: out)
+
+    assert network.get_default_interface() == "enp3s0"
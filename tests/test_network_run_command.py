@@ -0,0 +1,62 @@
+"""Tests for how bandsox.network spawns its privileged helpers."""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox import network  # noqa: E402
+
+
+def test_run_command_does_not_leak_python_fds(tmp_path):
+    # close_fds=False is only safe because Python's own fds are CLOEXEC.
+    # Park the fd well above anything the child opens itself.
+    with open(tmp_path / "held", "w") as held:
+        fd = os.dup2(held.fileno(), 200, inheritable=False)
+        try:
+            out = tmp_path / "fds"
+            result = network.run_command(
+                ["sh", "-c", f'ls /proc/self/fd > "{out}"'], check=False
+            )
+            assert result.returncode == 0
+            assert str(fd) not in out.read_text().split()
+        finally:
+            os.close(fd)
+
+
+def test_run_command_qualifies_the_program_for_posix_spawn(monkeypatch):
+    seen = {}
+
+    def fake_run(cmd, **kwargs):
+        seen["cmd"], seen["kwargs"] = cmd, kwargs
+
+    monkeypatch.setattr(network.subprocess, "run", fake_run)
+    network.run_command(["sh", "-c", "true"])
+
+    assert os.path.isabs(seen["cmd"][0]) and seen["cmd"][1:] == ["-c", "true"]
+    assert seen["kwargs"]["close_fds"] is False
+
+
+def test_program_under_sudo_is_resolved_from_system_dirs_only(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ("sudo", "sh"):
+        fake = bin_dir / name
+        fake.write_text("#!/bin/sh\n")
+        fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    network._program_path.cache_clear()
+    try:
+        cmd = network._qualify(["sudo", "sh", "-c", "true"])
+        flagged = network._qualify(["sudo", "-u", "nobody", "sh"])
+    finally:
+        network._program_path.cache_clear()
+
+    # sudo itself comes from the caller's PATH; what it runs as root doesn't.
+    assert cmd[0] == str(bin_dir / "sudo")
+    assert os.path.isabs(cmd[1]) and not cmd[1].startswith(str(tmp_path))
+    assert cmd[2:] == ["-c", "true"]
+    assert flagged[1:] == ["-u", "nobody", "sh"]
@@ -523,6 +523,15 @@ def test_terminal_websocket(client, fake_bs):
     assert fake_bs.vm.killed_sessions == ["session-1"]
 
 
+def test_terminal_websocket_accepts_binary_input(client, fake_bs):
+    with client.websocket_connect(f"/api/vms/{fake_bs.vm.vm_id}/terminal?cols=80&rows=24") as ws:
+        assert ws.receive_text() == "output"
+        ws.send_bytes(b"foo")
+        ws.send_text(json.dumps({"type": "resize", "cols": 100, "rows": 30}))
+    assert fake_bs.vm.inputs == [("session-1", "Zm9v", "base64")]
+    assert fake_bs.vm.resizes == [("session-1", 100, 30)]
+
+
 def test_terminal_websocket_accepts_subprotocol_auth(client, fake_bs, tmp_path, monkeypatch):
     auth_dir = tmp_path / "auth"
     auth_dir.mkdir()
@@ -0,0 +1,199 @@
+"""Tests for the host firewall rules installed by setup_tap_device."""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox import network  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rule_memo(monkeypatch):
+    monkeypatch.setattr(network, "_tap_nat_installed", {})
+
+
+def _setup_tap(existing, add_rc=0):
+    """Run setup_tap_device where only rules whose spec contains one of
+    ``existing`` pass `iptables -C` and adding rules exits with ``add_rc``;
+    return (run_command calls, restore input)."""
+    calls = []
+    restores = []
+
+    def fake_run_command(cmd, check=True):
+        calls.append(list(cmd))
+        if "-C" not in cmd:
+            return mock.MagicMock(returncode=add_rc)
+        ok = any(token in cmd for token in existing)
+        return mock.MagicMock(returncode=0 if ok else 1)
+
+    def fake_subprocess_run(cmd, **kwargs):
+        if "iptables-restore" in cmd:
+            restores.append(kwargs["input"])
+            return mock.MagicMock(returncode=add_rc, stdout="", stderr="")
+        return mock.MagicMock(returncode=0, stdout="", stderr="")
+
+    with mock.patch.object(network, "run_command", side_effect=fake_run_command), \
+         mock.patch.object(network.subprocess, "run", side_effect=fake_subprocess_run), \
+         mock.patch.object(network, "get_default_interface", return_value="eth0"), \
+         mock.patch.object(network, "_send_gratuitous_arp"), \
+         mock.patch.object(network, "_enable_ip_forward"), \
+         mock.patch.object(network, "_netlink_usable", return_value=False):
+        network.setup_tap_device("tapTEST", "172.16.78.1")
+    return calls, restores
+
+
+def test_missing_rules_are_added_in_one_restore():
+    calls, restores = _setup_tap(existing=["MASQUERADE", "conntrack"])
+
+    assert len(restores) == 1
+    assert restores[0] == (
+        "*filter\n"
+        "-I FORWARD -i tapTEST -o eth0 -j ACCEPT\n"
+        "-I FORWARD -o tapTEST -j ACCEPT\n"
+        "COMMIT\n"
+        "*mangle\n"
+        "-I FORWARD 1 -i tapTEST -o eth0 -p tcp --tcp-flags SYN,RST SYN "
+        "-j TCPMSS --clamp-mss-to-pmtu\n"
+        "COMMIT\n"
+    )
+    assert not [c for c in calls if "iptables" in c and "-C" not in c]
+
+
+def test_nothing_is_restored_when_all_rules_exist():
+    calls, restores = _setup_tap(existing=["-C"])
+
+    assert restores == []
+    assert sum(1 for c in calls if "iptables" in c) == 5
+
+
+def test_cleanup_removes_every_per_tap_rule_in_one_restore():
+    restores = []
+
+    def fake_subprocess_run(cmd, **kwargs):
+        restores.append(kwargs["input"])
+        return mock.MagicMock(returncode=0, stdout="", stderr="")
+
+    with mock.patch.object(network, "run_command") as run_command, \
+         mock.patch.object(network.subprocess, "run", side_effect=fake_subprocess_run), \
+         mock.patch.object(network, "get_default_interface", return_value="eth0"), \
+         mock.patch.object(network, "_netlink_usable", return_value=False):
+        network.cleanup_tap_device("tapTEST")
+
+    assert restores == [
+        "*filter\n"
+        "-D FORWARD -i tapTEST -o eth0 -j ACCEPT\n"
+        "-D FORWARD -o tapTEST -j ACCEPT\n"
+        "COMMIT\n"
+        "*mangle\n"
+        "-D FORWARD -i tapTEST -o eth0 -p tcp --tcp-flags SYN,RST SYN "
+        "-j TCPMSS --clamp-mss-to-pmtu\n"
+        "COMMIT\n"
+    ]
+    assert not [c for c in run_command.call_args_list if "iptables" in c.args[0]]
+
+
+def test_address_owner_reads_ip_json_and_falls_back_to_text():
+    addrs = (
+        '[{"ifname":"lo","addr_info":[{"local":"127.0.0.1"}]},'
+        '{"ifname":"tap1","addr_info":[{"local":"172.16.7.1","prefixlen":24}]}]'
+    )
+    json_ok = mock.MagicMock(returncode=0, stdout=addrs)
+    with mock.patch.object(network.subprocess, "run", return_value=json_ok):
+        assert network._ipv4_address_owner("172.16.7.1") == "tap1"
+        assert network._ipv4_address_owner("172.16.7.10") is None
+
+    no_json = mock.MagicMock(returncode=255, stdout="")
+    text = mock.MagicMock(
+        returncode=0, stdout="5: tap2    inet 172.16.9.1/24 scope global tap2\n"
+    )
+    with mock.patch.object(network.subprocess, "run", side_effect=[no_json, text]):
+        assert network._ipv4_address_owner("172.16.9.1") == "tap2"
+
+
+def test_ip_forward_is_only_written_when_off(tmp_path, monkeypatch):
+    proc = tmp_path / "ip_forward"
+    monkeypatch.setattr(network, "_PROC_IP_FORWARD", str(proc))
+    monkeypatch.setattr(network.os, "geteuid", lambda: 1000)
+    calls = []
+    monkeypatch.setattr(network, "run_command", lambda cmd, check=True: calls.append(cmd))
+
+    proc.write_text("1\n")
+    network._enable_ip_forward()
+    assert calls == []
+
+    proc.write_text("0\n")
+    network._enable_ip_forward()
+    assert calls == [["sudo", "sysctl", "-w", "net.ipv4.ip_forward=1"]]
+
+    monkeypatch.setattr(network.os, "geteuid", lambda: 0)
+    network._enable_ip_forward()
+    assert proc.read_text() == "1"
+    assert len(calls) == 1
+
+
+def test_rule_probes_run_concurrently():
+    import threading
+
+    rules = network._tap_firewall_rules("tapTEST", "eth0")[:3]
+    barrier = threading.Barrier(len(rules), timeout=5)
+
+    def fake_run_command(cmd, check=True):
+        barrier.wait()  # only passes if every probe is in flight at once
+        assert "-w" in cmd
+        return mock.MagicMock(returncode=1 if "MASQUERADE" in cmd else 0)
+
+    with mock.patch.object(network, "run_command", side_effect=fake_run_command):
+        assert network._missing_iptables_rules(rules) == rules[:1]
+
+
+def test_arping_overlaps_firewall_setup():
+    order = []
+    arping = mock.MagicMock()
+    arping.wait.side_effect = lambda timeout: order.append("arping reaped")
+
+    def start_arping(tap_name, host_ip, wait=True):
+        assert wait is False
+        order.append("arping started")
+        return arping
+
+    with mock.patch.object(network, "_setup_tap_link_shell"), \
+         mock.patch.object(network, "_netlink_usable", return_value=False), \
+         mock.patch.object(network, "_send_gratuitous_arp", side_effect=start_arping), \
+         mock.patch.object(network, "_setup_tap_forwarding",
+                           side_effect=lambda tap: order.append("forwarding")):
+        network.setup_tap_device("tapTEST", "172.16.78.1")
+
+    assert order == ["arping started", "forwarding", "arping reaped"]
+
+
+def test_repeat_setup_skips_probes_until_cleanup():
+    first, _ = _setup_tap(existing=[])
+    again, restores = _setup_tap(existing=[])
+    assert sum(1 for c in first if "iptables" in c) == 5
+    assert not [c for c in again if "iptables" in c] and restores == []
+
+    with mock.patch.object(network, "run_command"), \
+         mock.patch.object(network, "_apply_iptables_rules"), \
+         mock.patch.object(network, "get_default_interface", return_value="eth0"), \
+         mock.patch.object(network, "_netlink_usable", return_value=False):
+        network.cleanup_tap_device("tapTEST")
+
+    after_cleanup, _ = _setup_tap(existing=[])
+    assert sum(1 for c in after_cleanup if "iptables" in c) == 5
+
+
+def test_failed_rule_install_is_retried_on_next_setup():
+    first, restores = _setup_tap(existing=[], add_rc=1)
+    # iptables-restore failed, then every per-rule fallback failed too.
+    assert len(restores) == 1
+    assert sum(1 for c in first if "iptables" in c and "-C" not in c) == 5
+
+    again, _ = _setup_tap(existing=[])
+    assert sum(1 for c in again if "-C" in c) == 5
+    assert "tapTEST" in network._tap_nat_installed
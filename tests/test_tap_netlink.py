@@ -0,0 +1,126 @@
+"""Tests for managing TAP links over rtnetlink when BandSox runs as root."""
+
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bandsox import network  # noqa: E402
+
+
+class FakeNetlinkError(Exception):
+    pass
+
+
+class FakeIPRoute:
+    instances = []
+
+    def __init__(self):
+        self.calls = []
+        self.links = {"lo": 1}
+        self.addrs = {"127.0.0.1": 1}
+        FakeIPRoute.instances.append(self)
+
+    def close(self):
+        pass
+
+    def link(self, cmd, **kwargs):
+        self.calls.append(("link", cmd, kwargs))
+        if cmd == "add":
+            if kwargs["ifname"] in self.links:
+                raise FakeNetlinkError("File exists")
+            self.links[kwargs["ifname"]] = len(self.links) + 1
+        elif cmd == "del" and kwargs["ifname"] not in self.links:
+            raise FakeNetlinkError("No such device")
+
+    def link_lookup(self, ifname):
+        return [self.links[ifname]] if ifname in self.links else []
+
+    def addr(self, cmd, **kwargs):
+        self.calls.append(("addr", cmd, kwargs))
+        self.addrs[kwargs["address"]] = kwargs["index"]
+
+    def get_addr(self, family, address):
+        if address in self.addrs:
+            return [{"index": self.addrs[address]}]
+        return []
+
+    def get_links(self, index):
+        name = next(n for n, i in self.links.items() if i == index)
+        return [mock.MagicMock(get_attr=lambda attr: name)]
+
+
+def _netlink_root(run_command, applied=None):
+    FakeIPRoute.instances = []
+    stack = ExitStack()
+    for name, value in {
+        "IPRoute": FakeIPRoute,
+        "NetlinkError": FakeNetlinkError,
+        "_ipr": None,
+        "_netlink_usable": lambda: True,
+        "_ipv4_address_owner": lambda ip: pytest.fail("ip -json was run"),
+        "_send_gratuitous_arp": lambda *a, **kw: None,
+        "_enable_ip_forward": lambda: None,
+        "get_default_interface": lambda: "eth0",
+        "run_command": run_command,
+        "_apply_iptables_rules": (applied if applied is not None else []).extend,
+    }.items():
+        stack.enter_context(mock.patch.object(network, name, value, create=True))
+    return stack
+
+
+def _recorder(commands):
+    def fake_run_command(cmd, check=True):
+        commands.append(list(cmd))
+        return mock.MagicMock(returncode=0)
+
+    return fake_run_command
+
+
+def test_tap_link_is_configured_without_ip_execs():
+    commands = []
+    with _netlink_root(_recorder(commands)):
+        mac = network.setup_tap_device("tapNL", "172.16.9.1")
+
+    assert not [c for c in commands if "ip" in c]
+    calls = FakeIPRoute.instances[0].calls
+    assert calls[0][:2] == ("link", "add") and calls[0][2]["mode"] == "tap"
+    assert ("link", "set", {"index": 2, "address": mac}) in calls
+    assert ("addr", "add", {"index": 2, "address": "172.16.9.1", "prefixlen": 24}) in calls
+    assert calls[-1] == ("link", "set", {"index": 2, "state": "up"})
+
+
+def test_cleanup_of_missing_tap_still_removes_forward_rule():
+    applied = []
+    with _netlink_root(_recorder([]), applied):
+        network.cleanup_tap_device("tapGone")
+
+    assert FakeIPRoute.instances[0].calls == [("link", "del", {"ifname": "tapGone"})]
+    assert applied and all(op == ["-D"] and "tapGone" in spec for _, _, op, spec in applied)
+
+
+def test_one_netlink_socket_serves_setup_and_cleanup():
+    with _netlink_root(_recorder([])):
+        network.setup_tap_device("tapA", "172.16.10.1")
+        network.setup_tap_device("tapB", "172.16.11.1")
+        network.cleanup_tap_device("tapA")
+
+    assert len(FakeIPRoute.instances) == 1
+
+
+def test_address_held_by_another_link_is_rejected():
+    with _netlink_root(_recorder([])):
+        with pytest.raises(Exception, match="already assigned to lo"):
+            network.setup_tap_device("tapC", "127.0.0.1")
+        # Re-running setup for the same TAP is fine.
+        network.setup_tap_device("tapD", "172.16.12.1")
+        network.setup_tap_device("tapD", "172.16.12.1")
+
+    adds = [c for c in FakeIPRoute.instances[0].calls if c[0] == "addr"]
+    assert len(adds) == 1
@@ -81,6 +81,16 @@ class TestCIDAllocator:
             assert cid4 == cid1  # First released (sorted)
             assert cid5 == cid2  # Second released
 
+    def test_release_cid_ignores_duplicates(self, tmp_path):
+        """Test that releasing a CID twice keeps a single sorted entry."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bs = BandSox(storage_dir=tmpdir)
+            for cid in (7, 4, 9, 4, 7, 2):
+                bs._release_cid(cid)
+
+            with open(bs.cid_allocator_path) as f:
+                assert json.load(f)["free_cids"] == [4, 7, 9]
+
 
 class TestPortAllocator:
     """Tests for port allocation and release."""
@@ -133,6 +143,28 @@ class TestPortAllocator:
             assert port3 != port1
             assert port3 != port2
 
+    def test_wrap_around_skips_used_ports(self, tmp_path):
+        """Test that wrapping to the start of the pool skips in-use ports."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bs = BandSox(storage_dir=tmpdir)
+            with open(bs.port_allocator_path, "w") as f:
+                json.dump({"next_port": 9999, "used_ports": [9000, 9001]}, f)
+
+            assert bs._allocate_port() == 9999
+            assert bs._allocate_port() == 9002  # 9000/9001 still in use
+
+    def test_exhausted_pool_raises(self, tmp_path):
+        """Test that allocation fails loudly when every port is in use."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bs = BandSox(storage_dir=tmpdir)
+            with open(bs.port_allocator_path, "w") as f:
+                json.dump(
+                    {"next_port": 9000, "used_ports": list(range(9000, 10000))}, f
+                )
+
+            with pytest.raises(RuntimeError):
+                bs._allocate_port()
+
 
 # ============================================================================
 # Integration Tests for Vsock Bridge and File Transfer
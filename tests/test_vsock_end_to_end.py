@@ -161,3 +161,90 @@ class TestGuestAgentAgainstRealListener:
             e["type"] == "status" and e["payload"].get("status") == "uploaded"
             for e in events
         )
+
+
+def test_buffer_upload_spanning_several_receive_buffers(tmp_path):
+    """A multi-MB upload into a pending buffer arrives intact and verified."""
+    payload = os.urandom(3 * 1024 * 1024 + 17)
+    listener = VsockHostListener(uds_path=str(tmp_path / "vsock_vm.sock"), port=9000)
+    listener.start()
+    try:
+        slot = listener.register_pending_buffer("buf-cmd")
+        request = {
+            "type": "upload",
+            "cmd_id": "buf-cmd",
+            "path": "/guest/file.bin",
+            "size": len(payload),
+            "checksum": hashlib.md5(payload).hexdigest(),
+        }
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(10)
+            s.connect(listener.listener_path)
+            # Send the first payload bytes in the same segment as the
+            # request line to exercise the initial_data hand-off.
+            s.sendall(json.dumps(request).encode() + b"\n" + payload[:1000])
+            s.recv(4096)  # ready
+            s.sendall(payload[1000:])
+            reply = json.loads(s.recv(4096).split(b"\n", 1)[0])
+
+        assert reply["type"] == "complete", reply
+        assert slot["done"].wait(timeout=5)
+        assert slot["error"] is None
+        assert bytes(slot["buf"]) == payload
+    finally:
+        listener.stop()
+
+
+def test_trailing_checksum_mismatch_is_rejected(tmp_path):
+    payload = b"streamed then hashed" * 100
+    dest = tmp_path / "out.bin"
+    listener = VsockHostListener(uds_path=str(tmp_path / "vsock_vm.sock"), port=9000)
+    listener.start()
+    try:
+        listener.register_pending_upload("tc-cmd", str(dest))
+        request = {
+            "type": "upload",
+            "cmd_id": "tc-cmd",
+            "path": "/guest/file.bin",
+            "size": len(payload),
+            "trailing_checksum": True,
+        }
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(10)
+            s.connect(listener.listener_path)
+            s.sendall(json.dumps(request).encode() + b"\n")
+            s.recv(4096)  # ready
+            s.sendall(payload)
+            s.sendall(json.dumps({"type": "checksum", "md5": "0" * 32}).encode() + b"\n")
+            reply = json.loads(s.recv(4096).split(b"\n", 1)[0])
+
+        assert reply["type"] == "error"
+        assert "Checksum mismatch" in reply["error"]
+        assert not dest.exists()
+    finally:
+        listener.stop()
+
+
+def test_raw_download_sends_header_then_payload(tmp_path):
+    payload = os.urandom(2 * 1024 * 1024 + 3)
+    listener = VsockHostListener(uds_path=str(tmp_path / "vsock_vm.sock"), port=9000)
+    listener.start()
+    try:
+        listener.register_pending_download("dl-cmd", payload)
+        request = {"type": "download_raw", "cmd_id": "dl-cmd", "path": "/guest/x"}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(10)
+            s.connect(listener.listener_path)
+            s.sendall(json.dumps(request).encode() + b"\n")
+            received = bytearray()
+            while True:
+                chunk = s.recv(1 << 20)
+                if not chunk:
+                    break
+                received += chunk
+
+        header, body = bytes(received).split(b"\n", 1)
+        assert json.loads(header)["size"] == len(payload)
+        assert body == payload
+    finally:
+        listener.stop()
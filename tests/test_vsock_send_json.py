@@ -140,3 +140,31 @@ def test_concurrent_per_socket_writes_are_line_atomic():
                 f"(interleave bug reintroduced)"
             )
             assert payload.get("i") == idx
+
+
+def test_recv_json_msg_reassembles_message_split_across_sends():
+    """A message larger than one recv() and sent in pieces decodes intact."""
+    parent_sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        message = {"type": "ready", "data": "y" * 10000}
+        raw = json.dumps(message).encode("utf-8") + b"\n"
+
+        def send_in_pieces():
+            for start in range(0, len(raw), 1500):
+                child_sock.sendall(raw[start : start + 1500])
+
+        sender = threading.Thread(target=send_in_pieces)
+        sender.start()
+        assert agent.vsock_recv_json_msg(parent_sock) == message
+        sender.join()
+
+        child_sock.close()
+        try:
+            agent.vsock_recv_json_msg(parent_sock)
+        except Exception as exc:
+            assert "closed" in str(exc)
+        else:
+            raise AssertionError("expected closed-connection error")
+    finally:
+        parent_sock.close()
+        child_sock.close()